@@ -0,0 +1,272 @@
+"""
+Level-of-detail tile pyramid for zooming into egg masses.
+
+The 10 x 10 cm view is split into 2^level x 2^level tiles at each level.
+Coarse levels draw egg density, fine levels draw individual egg glyphs.
+Tiles are rendered on demand for a given laying progress and kept in an
+LRU cache, so zooming or panning only renders the tiles that come into view.
+The cache is bounded in bytes and shared by every pyramid in the process.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib
+from matplotlib.collections import EllipseCollection
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+WORLD_SIZE_CM = 10       # Tiles cover the same 0-10 cm area as the overview
+TILE_SIZE_PX = 256
+MAX_LEVEL = 10           # Finest level: 1024 x 1024 tiles, ~0.01 cm each
+DENSITY_BINS = 64        # Histogram resolution of a density tile
+MAX_GLYPHS_PER_TILE = 5000
+MIN_GLYPH_RADIUS_PX = 1.5
+OCEAN_COLOR = '#004466'
+TILE_CACHE_BYTES = 128 * 2 ** 20   # 512 RGBA tiles across all pyramids
+
+
+def morton_codes(ix, iy):
+    """Interleaves the bits of integer cell coordinates into Z-order codes."""
+    codes = np.zeros(len(ix), dtype=np.uint32)
+    for bit in range(MAX_LEVEL):
+        codes |= ((ix >> bit) & 1).astype(np.uint32) << (2 * bit)
+        codes |= ((iy >> bit) & 1).astype(np.uint32) << (2 * bit + 1)
+    return codes
+
+
+class TileCache:
+    """LRU cache of rendered tiles, bounded by the total bytes of the tiles it holds."""
+
+    def __init__(self, max_bytes=TILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def put(self, key, tile):
+        with self._lock:
+            previous = self._tiles.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.nbytes
+            self._tiles[key] = tile
+            self.bytes += tile.nbytes
+            while self.bytes > self.max_bytes and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tiles)
+
+
+shared_tile_cache = TileCache()
+
+
+class EggTilePyramid:
+    """
+    Renders and caches tiles of an egg mass at every zoom level.
+
+    Eggs are given as positions in cm with the laying progress (0-1) at which
+    each egg is laid. They are stored in Z-order at the finest level, so the
+    eggs of any tile at any level are one contiguous slice. Rendered tiles
+    go to shared_tile_cache unless another TileCache is given.
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, x, y, laid_at, draw_background=None, tile_cache=None):
+        cells = 2 ** MAX_LEVEL
+        ix = np.clip((np.asarray(x) / WORLD_SIZE_CM * cells).astype(np.int64), 0, cells - 1)
+        iy = np.clip((np.asarray(y) / WORLD_SIZE_CM * cells).astype(np.int64), 0, cells - 1)
+        codes = morton_codes(ix, iy)
+        order = np.argsort(codes, kind="stable")
+        self.codes = codes[order]
+        self.x = np.asarray(x, dtype=np.float32)[order]
+        self.y = np.asarray(y, dtype=np.float32)[order]
+        self.laid_at = np.asarray(laid_at, dtype=np.float32)[order]
+        self.num_eggs = len(self.codes)
+
+        # Size eggs so they roughly tile the area the mass occupies
+        cell_area = (WORLD_SIZE_CM / cells) ** 2
+        occupied_area = len(np.unique(self.codes)) * cell_area
+        self.egg_radius = min(0.05, 0.5 * np.sqrt(occupied_area / max(1, self.num_eggs)))
+
+        self.draw_background = draw_background
+        self.tile_cache = tile_cache if tile_cache is not None else shared_tile_cache
+        self._cache_id = next(self._ids)   # Unlike id(), never reused by a later pyramid
+        self._density_peaks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # --- Tile lookup ---
+
+    def tile_size(self, level):
+        """Width of a tile at the given level, in cm."""
+        return WORLD_SIZE_CM / 2 ** level
+
+    def _tile_slice(self, level, tx, ty):
+        """Index range of the eggs whose centers are inside a tile."""
+        code = int(morton_codes(np.array([tx]), np.array([ty]))[0])
+        shift = 2 * (MAX_LEVEL - level)
+        start = np.searchsorted(self.codes, code << shift, side="left")
+        end = np.searchsorted(self.codes, (code + 1) << shift, side="left")
+        return slice(start, end)
+
+    def _tile_eggs(self, level, tx, ty):
+        """
+        Indices of the eggs drawn in a tile, and whether they are drawn as
+        individual glyphs rather than density.
+        """
+        own = self._tile_slice(level, tx, ty)
+        size = self.tile_size(level)
+        radius_px = self.egg_radius / size * TILE_SIZE_PX
+        if radius_px < MIN_GLYPH_RADIUS_PX or own.stop - own.start > MAX_GLYPHS_PER_TILE:
+            return np.arange(own.start, own.stop), False
+
+        # Glyphs overhang tile edges, so also take eggs from neighbouring tiles that reach in
+        last = 2 ** level - 1
+        neighbours = [self._tile_slice(level, nx, ny)
+                      for nx in range(max(0, tx - 1), min(last, tx + 1) + 1)
+                      for ny in range(max(0, ty - 1), min(last, ty + 1) + 1)]
+        eggs = np.concatenate([np.arange(s.start, s.stop) for s in neighbours])
+        x0, y0, margin = tx * size, ty * size, self.egg_radius
+        x, y = self.x[eggs], self.y[eggs]
+        inside = ((x >= x0 - margin) & (x <= x0 + size + margin) &
+                  (y >= y0 - margin) & (y <= y0 + size + margin))
+        return eggs[inside], True
+
+    def _tile_state(self, eggs, progress):
+        """
+        Cache key component for a tile at a given progress. Tiles with no eggs
+        laid yet, or with every egg laid, look the same at any progress.
+        """
+        laid_at = self.laid_at[eggs]
+        if len(laid_at) == 0 or laid_at.min() > progress:
+            return "empty"
+        if laid_at.max() <= progress:
+            return "complete"
+        return progress
+
+    def get_tile(self, level, tx, ty, progress):
+        """Returns the RGBA array for a tile, rendering it on a cache miss."""
+        eggs, glyphs = self._tile_eggs(level, tx, ty)
+        key = (self._cache_id, level, tx, ty, self._tile_state(eggs, progress))
+        tile = self.tile_cache.get(key)
+        with self._lock:
+            if tile is not None:
+                self.hits += 1
+                return tile
+            self.misses += 1
+
+        tile = self._render_tile(level, tx, ty, eggs, glyphs, progress)
+        self.tile_cache.put(key, tile)
+        return tile
+
+    # --- Tile rendering ---
+
+    def _density_peak(self, level):
+        """Highest density-bin count at a level, so colors match across tiles."""
+        if level not in self._density_peaks:
+            # Past the finest cell size, scale the peak down by bin area instead
+            bins = 2 ** level * DENSITY_BINS
+            coarse_bins = min(bins, 2 ** MAX_LEVEL)
+            counts, _, _ = np.histogram2d(self.x, self.y, bins=coarse_bins,
+                                          range=[[0, WORLD_SIZE_CM], [0, WORLD_SIZE_CM]])
+            self._density_peaks[level] = max(1.0, counts.max() * (coarse_bins / bins) ** 2)
+        return self._density_peaks[level]
+
+    def _render_tile(self, level, tx, ty, eggs, glyphs, progress):
+        size = self.tile_size(level)
+        x0, y0 = tx * size, ty * size
+
+        fig = Figure(figsize=(1, 1), dpi=TILE_SIZE_PX)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_xlim(x0, x0 + size)
+        ax.set_ylim(y0, y0 + size)
+        ax.set_axis_off()
+        fig.patch.set_facecolor(OCEAN_COLOR)
+        if self.draw_background is not None:
+            self.draw_background(ax)
+
+        laid = self.laid_at[eggs] <= progress
+        x, y, laid_at = self.x[eggs][laid], self.y[eggs][laid], self.laid_at[eggs][laid]
+
+        if len(x) and glyphs:
+            colors = matplotlib.colormaps['YlOrRd'](0.3 + 0.4 * laid_at)
+            ax.add_collection(EllipseCollection(
+                widths=2 * self.egg_radius, heights=2 * self.egg_radius, angles=0,
+                units='xy', offsets=np.column_stack([x, y]), offset_transform=ax.transData,
+                facecolors=colors, edgecolors='white', linewidths=0.5, alpha=0.9,
+            ))
+        elif len(x):
+            counts, _, _ = np.histogram2d(x, y, bins=DENSITY_BINS,
+                                          range=[[x0, x0 + size], [y0, y0 + size]])
+            counts = np.ma.masked_equal(counts.T, 0)
+            ax.imshow(counts, extent=(x0, x0 + size, y0, y0 + size), origin='lower',
+                      cmap='YlOrRd', norm=LogNorm(vmin=1, vmax=self._density_peak(level)),
+                      interpolation='nearest', alpha=0.9)
+
+        canvas.draw()
+        return np.asarray(canvas.buffer_rgba()).copy()
+
+    # --- Views ---
+
+    def render_view(self, center_x, center_y, zoom, progress, view_px=2 * TILE_SIZE_PX):
+        """
+        Composes the visible tiles into a square RGBA image.
+
+        At zoom z the view is WORLD_SIZE_CM / 2^z wide and drawn from tiles at
+        level z + 1, so each screen pixel maps to roughly one tile pixel.
+        Returns the image and the (level, tile count) used.
+        """
+        zoom = int(np.clip(zoom, 0, MAX_LEVEL - 1))
+        level = zoom + 1
+        view_size = WORLD_SIZE_CM / 2 ** zoom
+        half = view_size / 2
+        center_x = float(np.clip(center_x, half, WORLD_SIZE_CM - half))
+        center_y = float(np.clip(center_y, half, WORLD_SIZE_CM - half))
+        x0, y0 = center_x - half, center_y - half
+
+        size = self.tile_size(level)
+        last = 2 ** level - 1
+        tx0, tx1 = int(x0 // size), min(last, int(np.ceil((x0 + view_size) / size)) - 1)
+        ty0, ty1 = int(y0 // size), min(last, int(np.ceil((y0 + view_size) / size)) - 1)
+
+        rows = []
+        for ty in range(ty1, ty0 - 1, -1):  # Image rows run top to bottom
+            rows.append(np.hstack([self.get_tile(level, tx, ty, progress) for tx in range(tx0, tx1 + 1)]))
+        mosaic = np.vstack(rows)
+
+        px_per_cm = TILE_SIZE_PX / size
+        left = int(round((x0 - tx0 * size) * px_per_cm))
+        top = int(round(((ty1 + 1) * size - (y0 + view_size)) * px_per_cm))
+        view = mosaic[top:top + view_px, left:left + view_px]
+        return view, (level, (tx1 - tx0 + 1) * (ty1 - ty0 + 1))
+
+    def cache_info(self):
+        """This pyramid's hits and misses, and the size of the tile cache it shares."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "tiles": len(self.tile_cache),
+            "mib": self.tile_cache.bytes / 2 ** 20,
+            "max_mib": self.tile_cache.max_bytes / 2 ** 20,
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.tile_cache.evictions,
+        }
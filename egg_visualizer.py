@@ -0,0 +1,489 @@
+"""
+Bird's-eye view rendering of egg laying patterns.
+"""
+
+import io
+import random
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import EllipseCollection
+from matplotlib.patches import Ellipse
+
+# --- Visualization Class ---
+
+FIGURE_SIZE_IN = 10      # Figures are square, 10 inches per side
+FULL_QUALITY_DPI = 200   # Matches st.pyplot's default savefig DPI
+MIN_PREVIEW_DPI = 30     # Lowest DPI used for autoplay frames
+PREVIEW_TIMING_SAMPLES = 8   # Preview DPIs whose latest render time the DPI picker remembers
+
+class EggLayingVisualizer:
+    """
+    Creates bird's-eye view visualization of egg laying patterns being formed progressively.
+    """
+    
+    def __init__(self, sea_slug, substrate, temperature, flow_rate):
+        self.sea_slug = sea_slug
+        self.substrate = substrate
+        self.temperature = temperature
+        self.flow_rate = flow_rate
+        self.current_step = 0
+        self.total_steps = 100  # More steps for smoother pattern progression
+        self.center_x, self.center_y = 5, 5
+        self.egg_positions = []  # Track all laid eggs
+        self.slug_positions = []  # Track slug movement
+        
+    def get_step_info(self, step):
+        """Returns title and description for each step."""
+        progress = step / self.total_steps
+        if progress < 0.1:
+            return ("Positioning", "Sea slug finds optimal laying position")
+        elif progress < 0.2:
+            return ("First Contact", "Beginning to lay eggs and form matrix")
+        elif progress < 0.9:
+            return ("Pattern Formation", f"Actively creating {self.sea_slug.egg_mass_shape} pattern")
+        else:
+            return ("Completion", "Egg mass pattern complete")
+
+    def egg_layout(self, num_eggs, rng):
+        """
+        Positions every egg of the finished mass along the same path the
+        pattern is drawn with. Returns (x, y, laid_at), where laid_at is the
+        progress (0-1) at which each egg is laid.
+        """
+        laid_at = np.sort(rng.random(num_eggs))
+        shape = self.sea_slug.egg_mass_shape.lower()
+
+        if "spiral" in shape:
+            max_turns = 3 if "large" in self.sea_slug.egg_mass_shape else 2
+            angle = max_turns * 2 * np.pi * laid_at
+            radius = laid_at * 2.5
+            x = self.center_x + radius * np.cos(angle)
+            y = self.center_y + radius * np.sin(angle)
+            spread = 0.15 + 0.1 * np.sin(angle * 2)
+        elif "ribbon" in shape:
+            t = 4 * laid_at
+            x = self.center_x - 2 + t
+            y = self.center_y + 0.5 * np.sin(2 * np.pi * t / 4)
+            spread = 0.12 + 0.05 * np.sin(4 * np.pi * t / 4)
+        elif "cluster" in shape:
+            # Like the overview, cluster i appears whole once int(8 * progress) > i
+            cluster = np.minimum(7, (laid_at * 8).astype(int))
+            laid_at = (cluster + 1) / 8
+            angle = cluster * 2 * np.pi / 8
+            radius = 1.5 + 0.5 * (cluster % 2)
+            x = self.center_x + radius * np.cos(angle)
+            y = self.center_y + radius * np.sin(angle)
+            spread = np.full(num_eggs, 0.25)
+        else:
+            angle = 4 * 2 * np.pi * laid_at
+            x = self.center_x + 1.5 * np.cos(angle) + (0.3 * (angle / (2 * np.pi)) % 0.3) * 0.1
+            y = self.center_y + 1.5 * np.sin(angle)
+            spread = np.full(num_eggs, 0.1)
+
+        # Scatter eggs evenly across the width of the mass
+        offset = spread * np.sqrt(rng.random(num_eggs))
+        offset_angle = rng.random(num_eggs) * 2 * np.pi
+        return x + offset * np.cos(offset_angle), y + offset * np.sin(offset_angle), laid_at
+
+    def create_visualization(self, step, quality="full"):
+        """
+        Creates a bird's-eye view of the progressive egg laying pattern.
+        A "preview" quality frame skips substrate texture and overlay boxes, and
+        draws eggs as one lightweight collection, so it can be drawn quickly
+        during autoplay.
+        """
+        detailed = quality == "full"
+        fig, ax = plt.subplots(1, 1, figsize=(FIGURE_SIZE_IN, FIGURE_SIZE_IN))
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 10)
+        ax.set_aspect('equal')
+        
+        # Set ocean-like background
+        ax.set_facecolor('#004466')
+        
+        # Draw substrate from bird's eye view
+        self._draw_substrate_overhead(ax, detailed)
+        
+        # Calculate current pattern progress
+        progress = step / self.total_steps
+        
+        # Generate and draw the egg laying pattern
+        if "spiral" in self.sea_slug.egg_mass_shape.lower():
+            self._draw_spiral_pattern(ax, progress, detailed)
+        elif "ribbon" in self.sea_slug.egg_mass_shape.lower():
+            self._draw_ribbon_pattern(ax, progress, detailed)
+        elif "cluster" in self.sea_slug.egg_mass_shape.lower():
+            self._draw_cluster_pattern(ax, progress, detailed)
+        else:
+            self._draw_coil_pattern(ax, progress, detailed)
+        
+        # Draw sea slug at current position
+        self._draw_slug_overhead(ax, progress)
+        
+        # Add grid and labels
+        ax.grid(True, alpha=0.2, color='white')
+        ax.set_title(f"Bird's Eye View: {self.get_step_info(step)[0]}", 
+                    fontsize=14, fontweight='bold', color='white')
+        ax.set_xlabel("Distance (cm)", fontsize=10, color='white')
+        ax.set_ylabel("Distance (cm)", fontsize=10, color='white')
+        
+        # Add environment info
+        self._add_environment_overlay(ax, detailed)
+        
+        return fig
+    
+    def _draw_substrate_overhead(self, ax, detailed=True):
+        """Draw substrate from overhead view."""
+        if self.substrate == "rock":
+            # Rocky surface with texture
+            rock = plt.Circle((self.center_x, self.center_y), 4, 
+                            facecolor='#666666', edgecolor='#444444', linewidth=2, alpha=0.8)
+            ax.add_patch(rock)
+            # Add rock texture spots
+            for i in range(15 if detailed else 0):
+                x = self.center_x + random.uniform(-3, 3)
+                y = self.center_y + random.uniform(-3, 3)
+                if (x - self.center_x)**2 + (y - self.center_y)**2 <= 16:  # Within rock
+                    spot = plt.Circle((x, y), random.uniform(0.1, 0.3), 
+                                    color='#555555', alpha=0.6)
+                    ax.add_patch(spot)
+        elif self.substrate == "seaweed":
+            # Seaweed fronds
+            for i in range(8):
+                angle = i * 45
+                x = self.center_x + 2 * np.cos(np.radians(angle))
+                y = self.center_y + 2 * np.sin(np.radians(angle))
+                frond = plt.Circle((x, y), 0.8, color='#2d5016', alpha=0.7)
+                ax.add_patch(frond)
+        else:
+            # Default substrate (sediment/coral)
+            substrate = plt.Circle((self.center_x, self.center_y), 3.5, 
+                                 facecolor='#8B7355', edgecolor='#654321', alpha=0.8)
+            ax.add_patch(substrate)
+    
+    def _draw_spiral_pattern(self, ax, progress, detailed=True):
+        """Draw progressive spiral egg laying pattern."""
+        # Spiral parameters
+        max_turns = 3 if "large" in self.sea_slug.egg_mass_shape else 2
+        max_radius = 2.5
+        
+        # Calculate how much of spiral to show
+        total_angle = max_turns * 2 * np.pi
+        current_angle = total_angle * progress
+        
+        # Generate spiral points
+        angles = np.linspace(0, current_angle, int(current_angle * 20))
+        preview_eggs = []
+        
+        for i, angle in enumerate(angles):
+            radius = (angle / total_angle) * max_radius
+            x = self.center_x + radius * np.cos(angle)
+            y = self.center_y + radius * np.sin(angle)
+            
+            # Egg mass thickness varies along spiral
+            thickness = 0.15 + 0.1 * np.sin(angle * 2)
+            
+            # Color gradient from fresh (yellow) to older (orange)
+            age_factor = i / len(angles) if len(angles) > 0 else 0
+            color = plt.cm.YlOrRd(0.3 + 0.4 * age_factor)
+            
+            # Draw egg mass segment
+            egg_mass = plt.Circle((x, y), thickness, color=color, alpha=0.8)
+            ax.add_patch(egg_mass)
+            
+            # Add individual eggs within the mass
+            if i % 5 == 0:  # Every 5th segment
+                for j in range(3):
+                    egg_x = x + random.uniform(-thickness/2, thickness/2)
+                    egg_y = y + random.uniform(-thickness/2, thickness/2)
+                    self._add_egg(ax, preview_eggs, egg_x, egg_y, 0.03, detailed)
+        self._draw_preview_eggs(ax, preview_eggs)
+        
+        # Current laying position (bright spot)
+        if progress > 0 and len(angles) > 0:
+            current_radius = (current_angle / total_angle) * max_radius
+            curr_x = self.center_x + current_radius * np.cos(current_angle)
+            curr_y = self.center_y + current_radius * np.sin(current_angle)
+            current_spot = plt.Circle((curr_x, curr_y), 0.2, color='#FFD700', alpha=1.0)
+            ax.add_patch(current_spot)
+    
+    def _draw_ribbon_pattern(self, ax, progress, detailed=True):
+        """Draw progressive ribbon egg laying pattern."""
+        # Ribbon parameters
+        ribbon_length = 4
+        waves = 2
+        
+        # Calculate current ribbon length
+        current_length = ribbon_length * progress
+        
+        # Generate ribbon points
+        t_values = np.linspace(0, current_length, int(current_length * 25))
+        preview_eggs = []
+        
+        for i, t in enumerate(t_values):
+            # Sinusoidal ribbon path
+            x = self.center_x - 2 + t
+            y = self.center_y + 0.5 * np.sin(waves * np.pi * t / ribbon_length)
+            
+            # Ribbon width
+            width = 0.12 + 0.05 * np.sin(4 * np.pi * t / ribbon_length)
+            
+            # Color gradient
+            age_factor = i / len(t_values) if len(t_values) > 0 else 0
+            color = plt.cm.YlOrRd(0.2 + 0.5 * age_factor)
+            
+            # Draw ribbon segment
+            ribbon_seg = plt.Circle((x, y), width, color=color, alpha=0.8)
+            ax.add_patch(ribbon_seg)
+            
+            # Add eggs
+            if i % 4 == 0:
+                for j in range(2):
+                    egg_x = x + random.uniform(-width, width)
+                    egg_y = y + random.uniform(-width, width)
+                    self._add_egg(ax, preview_eggs, egg_x, egg_y, 0.025, detailed)
+        self._draw_preview_eggs(ax, preview_eggs)
+        
+        # Current laying position
+        if progress > 0 and len(t_values) > 0:
+            current_t = current_length
+            curr_x = self.center_x - 2 + current_t
+            curr_y = self.center_y + 0.5 * np.sin(waves * np.pi * current_t / ribbon_length)
+            current_spot = plt.Circle((curr_x, curr_y), 0.15, color='#FFD700', alpha=1.0)
+            ax.add_patch(current_spot)
+    
+    def _draw_cluster_pattern(self, ax, progress, detailed=True):
+        """Draw progressive cluster egg laying pattern."""
+        max_clusters = 8
+        current_clusters = int(max_clusters * progress)
+        
+        # Predefined cluster positions
+        cluster_positions = []
+        for i in range(max_clusters):
+            angle = i * 2 * np.pi / max_clusters
+            radius = 1.5 + 0.5 * (i % 2)  # Alternating radii
+            x = self.center_x + radius * np.cos(angle)
+            y = self.center_y + radius * np.sin(angle)
+            cluster_positions.append((x, y))
+        
+        preview_eggs = []
+        for i in range(current_clusters):
+            x, y = cluster_positions[i]
+            
+            # Cluster size varies
+            cluster_size = 0.2 + 0.1 * random.random()
+            
+            # Color based on order (older = more orange)
+            age_factor = i / max_clusters
+            color = plt.cm.YlOrRd(0.3 + 0.4 * age_factor)
+            
+            # Main cluster
+            cluster = plt.Circle((x, y), cluster_size, color=color, alpha=0.8)
+            ax.add_patch(cluster)
+            
+            # Individual eggs in cluster
+            for j in range(5):
+                egg_x = x + random.uniform(-cluster_size, cluster_size)
+                egg_y = y + random.uniform(-cluster_size, cluster_size)
+                self._add_egg(ax, preview_eggs, egg_x, egg_y, 0.03, detailed)
+        self._draw_preview_eggs(ax, preview_eggs)
+        
+        # Show next cluster position if in progress
+        if current_clusters < max_clusters:
+            next_x, next_y = cluster_positions[current_clusters]
+            next_spot = plt.Circle((next_x, next_y), 0.1, color='#FFD700', alpha=0.7)
+            ax.add_patch(next_spot)
+    
+    def _draw_coil_pattern(self, ax, progress, detailed=True):
+        """Draw progressive coil/tube pattern (for Aglajids)."""
+        # Coil parameters
+        coil_radius = 1.5
+        coil_height = 0.3
+        turns = 4
+        
+        # Current progress through coil
+        current_turn = turns * progress
+        
+        # Generate coil points
+        angles = np.linspace(0, current_turn * 2 * np.pi, int(current_turn * 30))
+        preview_eggs = []
+        
+        for i, angle in enumerate(angles):
+            # Coil position
+            x = self.center_x + coil_radius * np.cos(angle)
+            y = self.center_y + coil_radius * np.sin(angle)
+            
+            # Add vertical component (simulated in 2D)
+            vertical_offset = coil_height * (angle / (2 * np.pi)) % coil_height
+            x += vertical_offset * 0.1  # Slight offset to show coiling
+            
+            # Tube thickness
+            thickness = 0.1
+            
+            # Color gradient
+            age_factor = i / len(angles) if len(angles) > 0 else 0
+            color = plt.cm.YlOrRd(0.3 + 0.4 * age_factor)
+            
+            # Draw tube segment
+            tube_seg = plt.Circle((x, y), thickness, color=color, alpha=0.8)
+            ax.add_patch(tube_seg)
+            
+            # Add eggs
+            if i % 6 == 0:
+                self._add_egg(ax, preview_eggs, x, y, 0.02, detailed)
+        self._draw_preview_eggs(ax, preview_eggs)
+        
+        # Current laying position
+        if progress > 0 and len(angles) > 0:
+            current_angle = current_turn * 2 * np.pi
+            curr_x = self.center_x + coil_radius * np.cos(current_angle)
+            curr_y = self.center_y + coil_radius * np.sin(current_angle)
+            current_spot = plt.Circle((curr_x, curr_y), 0.12, color='#FFD700', alpha=1.0)
+            ax.add_patch(current_spot)
+    
+    def _add_egg(self, ax, preview_eggs, x, y, radius, detailed):
+        """
+        Draw one egg as its own patch, or collect it for _draw_preview_eggs
+        when rendering a preview frame.
+        """
+        if detailed:
+            egg = plt.Circle((x, y), radius, color='white', alpha=0.9)
+            ax.add_patch(egg)
+        else:
+            preview_eggs.append((x, y, radius))
+    
+    def _draw_preview_eggs(self, ax, preview_eggs):
+        """Draw collected eggs as a single collection, which is far cheaper than one patch each."""
+        if not preview_eggs:
+            return
+        eggs = np.array(preview_eggs)
+        ax.add_collection(EllipseCollection(
+            widths=2 * eggs[:, 2], heights=2 * eggs[:, 2], angles=0, units='xy',
+            offsets=eggs[:, :2], offset_transform=ax.transData,
+            facecolors='white', edgecolors='none', alpha=0.9,
+        ))
+    
+    def _draw_slug_overhead(self, ax, progress):
+        """Draw sea slug from overhead view at current laying position."""
+        if "spiral" in self.sea_slug.egg_mass_shape.lower():
+            # Slug follows spiral path
+            max_turns = 3 if "large" in self.sea_slug.egg_mass_shape else 2
+            total_angle = max_turns * 2 * np.pi * progress
+            radius = (total_angle / (max_turns * 2 * np.pi)) * 2.5
+            slug_x = self.center_x + radius * np.cos(total_angle)
+            slug_y = self.center_y + radius * np.sin(total_angle)
+            slug_angle = total_angle + np.pi/2  # Perpendicular to spiral
+            
+        elif "ribbon" in self.sea_slug.egg_mass_shape.lower():
+            # Slug follows ribbon path
+            ribbon_length = 4 * progress
+            slug_x = self.center_x - 2 + ribbon_length
+            slug_y = self.center_y + 0.5 * np.sin(2 * np.pi * ribbon_length / 4)
+            slug_angle = 0  # Facing forward along ribbon
+            
+        else:
+            # Default positioning
+            slug_x, slug_y = self.center_x, self.center_y
+            slug_angle = 0
+        
+        # Draw slug body (elongated oval)
+        slug_length, slug_width = 0.6, 0.3
+        slug_body = Ellipse((slug_x, slug_y), slug_length, slug_width, 
+                          angle=np.degrees(slug_angle), 
+                          facecolor='orange', edgecolor='darkorange', alpha=0.9)
+        ax.add_patch(slug_body)
+        
+        # Draw tentacles/rhinophores
+        for offset in [-0.1, 0.1]:
+            tentacle_x = slug_x + 0.2 * np.cos(slug_angle) 
+            tentacle_y = slug_y + 0.2 * np.sin(slug_angle) + offset
+            tentacle = plt.Circle((tentacle_x, tentacle_y), 0.05, color='red', alpha=0.8)
+            ax.add_patch(tentacle)
+    
+    def _add_environment_overlay(self, ax, detailed=True):
+        """Add environmental condition indicators, boxed when detailed."""
+        def bbox(facecolor, alpha):
+            return dict(boxstyle="round,pad=0.3", facecolor=facecolor, alpha=alpha) if detailed else None
+
+        # Temperature indicator (top-left) - using text instead of emoji
+        temp_color = '#ff4444' if self.temperature > 25 else '#4444ff' if self.temperature < 15 else '#44ff44'
+        ax.text(0.5, 9.5, f'TEMP: {self.temperature}°C', fontsize=12, color=temp_color, 
+                bbox=bbox('white', 0.8))
+        
+        # Flow indicator (top-right) - using arrows instead of emoji
+        flow_arrows = '→' * int(self.flow_rate * 5 + 1)
+        ax.text(8.5, 9.5, f'FLOW: {flow_arrows}', fontsize=12, color='#00aaff',
+                bbox=bbox('white', 0.8))
+        
+        # Substrate indicator (bottom-left) - using text instead of emojis
+        substrate_names = {
+            'rock': 'ROCK', 
+            'seaweed': 'SEAWEED', 
+            'coral': 'CORAL',
+            'sediment': 'SEDIMENT'
+        }
+        substrate_text = substrate_names.get(self.substrate, 'SUBSTRATE')
+        ax.text(0.5, 0.5, f'{substrate_text}', fontsize=10, color='white',
+                bbox=bbox('black', 0.6))
+
+# --- Frame Rendering ---
+
+def fit_render_cost(samples):
+    """
+    Least-squares fit of render seconds = fixed + per_dpi2 * DPI^2 to
+    (dpi, seconds) samples. Returns (fixed, per_dpi2), or None until the
+    samples cover at least two DPIs.
+    """
+    dpis = np.array([dpi for dpi, _ in samples], dtype=float)
+    if len(np.unique(dpis)) < 2:
+        return None
+    seconds = np.array([seconds for _, seconds in samples], dtype=float)
+    terms = np.column_stack([np.ones_like(dpis), dpis ** 2])
+    (fixed, per_dpi2), *_ = np.linalg.lstsq(terms, seconds, rcond=None)
+    return max(0.0, fixed), per_dpi2
+
+def choose_preview_dpi(container_width_px, frame_budget, samples=()):
+    """
+    Picks an autoplay frame DPI that fills the display width, lowered only as
+    far as it helps meet the frame budget. samples are (dpi, seconds) pairs
+    from recent preview frames. Render time is modelled as a fixed cost for
+    building the figure plus a cost that scales with pixel count (DPI squared).
+    """
+    def clamp(dpi):
+        return int(min(FULL_QUALITY_DPI, max(MIN_PREVIEW_DPI, dpi)))
+
+    display_dpi = clamp(container_width_px / FIGURE_SIZE_IN)
+    samples = list(samples)
+    if not samples:
+        return display_dpi
+
+    cost = fit_render_cost(samples)
+    if cost is None:
+        # Only one DPI measured: if it is over budget, try a lower one to learn how time scales
+        last_dpi, last_seconds = samples[-1]
+        if last_seconds <= frame_budget:
+            return display_dpi
+        return clamp(min(display_dpi, max(last_dpi / 2, last_dpi * (frame_budget / last_seconds) ** 0.5)))
+
+    fixed, per_dpi2 = cost
+    if per_dpi2 <= 0:
+        return display_dpi  # Lowering the DPI does not make frames measurably faster
+    # When the fixed cost alone exceeds the budget, stop once pixels are a small share of the cost
+    pixel_budget = max(frame_budget - fixed, fixed / 4)
+    return clamp(min(display_dpi, (pixel_budget / per_dpi2) ** 0.5))
+
+def render_frame(visualizer, step, quality, dpi):
+    """
+    Renders a step to PNG bytes. Returns (png_bytes, render_seconds).
+    Only full-quality frames are cropped to their contents, since cropping
+    draws the figure twice.
+    """
+    start = time.perf_counter()
+    fig = visualizer.create_visualization(step, quality=quality)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight" if quality == "full" else None)
+    plt.close(fig)
+    return buffer.getvalue(), time.perf_counter() - start
+
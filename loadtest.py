@@ -0,0 +1,430 @@
+"""
+Multi-session load test for the Streamlit app.
+
+Spins up N concurrent in-process sessions with Streamlit's AppTest, gives
+each one its own species and environment settings, drives the step and Play
+buttons, and writes a JSON report with rerun latency percentiles, achieved
+autoplay FPS versus ``play_speed``, and server CPU and RSS per session.
+
+Runs entirely on one Linux box with no external services:
+
+    python loadtest.py --sessions 8 --output loadtest_report.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+
+from streamlit.runtime.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+import streamlit
+
+from render_service import running_service
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+PLAY_SPEEDS = [0.5, 1.0, 2.0, 5.0]
+PERCENTILES = [50, 90, 95, 99]
+
+
+def target_fps(play_speed):
+    """Frame rate the app's autoplay pacing aims for at a given speed."""
+    # Mirrors autoplay_delay() in streamlit_app.py
+    return 1.0 / max(0.1, 0.3 / play_speed)
+
+
+def percentile_summary(samples):
+    """Summarise latency samples (seconds) as millisecond percentiles."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    summary = {"count": len(ordered)}
+    for p in PERCENTILES:
+        # Nearest-rank percentile
+        rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        summary[f"p{p}_ms"] = round(ordered[rank] * 1000, 2)
+    summary["mean_ms"] = round(statistics.fmean(ordered) * 1000, 2)
+    summary["max_ms"] = round(ordered[-1] * 1000, 2)
+    return summary
+
+
+def frame_size_summary(runs):
+    """Mean encoded frame size in KiB for each render quality."""
+    sizes = {}
+    for run in runs:
+        if run["frame_bytes"] is not None:
+            sizes.setdefault(run["frame_quality"], []).append(run["frame_bytes"])
+    return {quality: round(statistics.fmean(values) / 1024, 1) for quality, values in sizes.items()}
+
+
+def frame_time_summary(runs):
+    """
+    Mean milliseconds a frame spent rendering on a worker, and end to end
+    including time queued for the render service, for each render quality.
+    """
+    times = {}
+    for run in runs:
+        if run["frame_render_seconds"] is not None:
+            times.setdefault(run["frame_quality"], []).append((run["frame_render_seconds"], run["frame_wait_seconds"]))
+    return {
+        quality: {
+            "render": round(statistics.fmean(render for render, _ in values) * 1000, 1),
+            "wait": round(statistics.fmean(wait for _, wait in values) * 1000, 1),
+        }
+        for quality, values in times.items()
+    }
+
+
+def current_rss_bytes(pid="self"):
+    """Resident set size of a process, read from /proc."""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except FileNotFoundError:
+        return 0
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def server_rss_bytes():
+    """RSS of the server process plus its render workers."""
+    service = running_service()
+    worker_pids = service.worker_pids() if service is not None else []
+    return current_rss_bytes() + sum(current_rss_bytes(pid) for pid in worker_pids)
+
+
+# --- Instrumentation ---
+
+class SleepLedger:
+    """
+    Patches time.sleep to record how long each thread spends pacing, so the
+    autoplay delay can be separated from the real cost of a rerun.
+    """
+    def __init__(self):
+        self._sleep = time.sleep
+        self._local = threading.local()
+
+    def sleep(self, seconds):
+        start = time.perf_counter()
+        self._sleep(seconds)
+        self._local.slept = getattr(self._local, "slept", 0.0) + time.perf_counter() - start
+
+    def take(self):
+        """Returns and resets the sleep time recorded on the calling thread."""
+        slept = getattr(self._local, "slept", 0.0)
+        self._local.slept = 0.0
+        return slept
+
+    def __enter__(self):
+        time.sleep = self.sleep
+        return self
+
+    def __exit__(self, *exc_info):
+        time.sleep = self._sleep
+
+
+class SharedRuntime:
+    """
+    AppTest installs a mock Runtime for each run and clears it afterwards,
+    which breaks sessions still running on other threads. While active, keep
+    serving the most recently installed Runtime instead.
+    """
+    def __init__(self):
+        self._last = None
+        self._saved = None
+
+    def instance(self):
+        if Runtime._instance is not None:
+            self._last = Runtime._instance
+        if self._last is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return self._last
+
+    def exists(self):
+        return Runtime._instance is not None or self._last is not None
+
+    def __enter__(self):
+        self._saved = (Runtime.__dict__["instance"], Runtime.__dict__["exists"])
+        Runtime.instance = self.instance
+        Runtime.exists = self.exists
+        return self
+
+    def __exit__(self, *exc_info):
+        Runtime.instance, Runtime.exists = self._saved
+
+
+class RssSampler(threading.Thread):
+    """Samples server RSS in the background to find the peak during the run."""
+    def __init__(self, interval=0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = server_rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, server_rss_bytes())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, server_rss_bytes())
+
+
+class SessionStats:
+    """
+    Per-session record of every script run, filled in from the script thread.
+    """
+    def __init__(self, session_id, ledger):
+        self.session_id = session_id
+        self.ledger = ledger
+        self.phase = "setup"
+        self.settings = {}
+        self.runs = []
+        self.error = None
+
+    def record_run(self, started, finished, cpu_seconds, step_before, step_after, frame):
+        slept = self.ledger.take()
+        self.runs.append({
+            "phase": self.phase,
+            "started": started,
+            "finished": finished,
+            "latency": max(0.0, finished - started - slept),
+            "cpu": cpu_seconds,
+            "advanced": step_after > step_before,
+            "frame_quality": frame["quality"] if frame else None,
+            "frame_bytes": frame["bytes"] if frame else None,
+            "frame_render_seconds": frame["render_seconds"] if frame else None,
+            "frame_wait_seconds": frame["wait_seconds"] if frame else None,
+        })
+
+    def frames(self):
+        return [run for run in self.runs if run["phase"] == "play" and run["advanced"]]
+
+    def summary(self):
+        frames = self.frames()
+        achieved_fps = None
+        if len(frames) > 1:
+            elapsed = frames[-1]["finished"] - frames[0]["started"]
+            achieved_fps = round(len(frames) / elapsed, 2) if elapsed > 0 else None
+        play_speed = self.settings.get("play_speed")
+        return {
+            "session_id": self.session_id,
+            "settings": self.settings,
+            "reruns": len(self.runs),
+            "frames_played": len(frames),
+            "play_speed": play_speed,
+            "displayed_fps": round(play_speed * 3, 2) if play_speed else None,
+            "target_fps": round(target_fps(play_speed), 2) if play_speed else None,
+            "achieved_fps": achieved_fps,
+            "cpu_seconds": round(sum(run["cpu"] for run in self.runs), 3),
+            "rerun_latency": percentile_summary([run["latency"] for run in self.runs]),
+            "frame_kib": frame_size_summary(self.runs),
+            "frame_ms": frame_time_summary(self.runs),
+            "error": self.error,
+        }
+
+
+def _instrumented_app(app_path, stats):
+    """Script body handed to AppTest: runs the real app and times each rerun."""
+    import runpy
+    import time
+    import streamlit as st
+
+    step_before = st.session_state.get("current_step", 0)
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        runpy.run_path(app_path, run_name="__main__")
+    finally:
+        stats.record_run(
+            started,
+            time.perf_counter(),
+            time.thread_time() - cpu_started,
+            step_before,
+            st.session_state.get("current_step", 0),
+            st.session_state.get("last_frame"),
+        )
+
+
+# --- Session driver ---
+
+def _button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+def drive_session(stats, rng, args, barrier):
+    """Configures one session, steps through the pattern, then plays it out."""
+    at = AppTest.from_function(
+        _instrumented_app,
+        default_timeout=args.timeout,
+        kwargs={"app_path": APP_PATH, "stats": stats},
+    )
+    try:
+        barrier.wait()
+        at.run()
+
+        species_options = at.sidebar.selectbox[0].options
+        species = species_options[stats.session_id % len(species_options)]
+        at.sidebar.selectbox[0].select(species).run()
+
+        substrate = rng.choice(at.sidebar.selectbox[1].options)
+        temperature = rng.randint(10, 30)
+        flow_rate = round(rng.randint(0, 10) / 10, 1)
+        play_speed = PLAY_SPEEDS[stats.session_id % len(PLAY_SPEEDS)]
+        at.sidebar.slider[0].set_value(temperature)
+        at.sidebar.slider[1].set_value(flow_rate)
+        at.sidebar.selectbox[1].select(substrate)
+        at.select_slider[0].set_value(play_speed)
+        at.run()
+        stats.settings = {
+            "species": species,
+            "substrate": substrate,
+            "temperature": temperature,
+            "flow_rate": flow_rate,
+            "play_speed": play_speed,
+        }
+
+        stats.phase = "step"
+        for label in ["+1", "+1", ">> +10", "-1", ">> +10", "-10"]:
+            _button(at, label).click().run()
+
+        # Start playback close enough to the end that the run stays bounded
+        stats.phase = "play"
+        at.session_state.current_step = max(0, 99 - args.play_frames)
+        _button(at, "Play").click().run()
+        if at.exception:
+            stats.error = at.exception[0].message
+    except Exception as exc:
+        stats.error = f"{type(exc).__name__}: {exc}"
+
+
+def run_load_test(args):
+    """Runs all sessions concurrently and returns the report dictionary."""
+    rng = random.Random(args.seed)
+    barrier = threading.Barrier(args.sessions)
+    baseline_rss = server_rss_bytes()
+    sampler = RssSampler()
+
+    # Pin the AppTest flag so overlapping runs don't restore it under each other
+    with SharedRuntime(), patch_config_options({"global.appTest": True}), SleepLedger() as ledger:
+        sessions = [SessionStats(i, ledger) for i in range(args.sessions)]
+        threads = [
+            threading.Thread(
+                target=drive_session,
+                args=(stats, random.Random(rng.random()), args, barrier),
+                name=f"loadtest-session-{stats.session_id}",
+            )
+            for stats in sessions
+        ]
+        sampler.start()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - wall_started
+        cpu_seconds = time.process_time() - cpu_started
+        service = running_service()
+        service_stats = service.stats() if service is not None else None
+        sampler.stop()
+
+    worker_cpu_seconds = 0.0
+    if service_stats is not None:
+        worker_cpu_seconds = sum(worker["cpu_seconds"] for worker in service_stats["per_worker"])
+    server_cpu_seconds = cpu_seconds + worker_cpu_seconds
+
+    all_runs = [run for stats in sessions for run in stats.runs]
+    per_session = [stats.summary() for stats in sessions]
+    achieved = [s["achieved_fps"] for s in per_session if s["achieved_fps"]]
+    rss_growth = max(0, sampler.peak - baseline_rss)
+    mib = 1024 * 1024
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "sessions": args.sessions,
+            "play_frames": args.play_frames,
+            "seed": args.seed,
+        },
+        "wall_seconds": round(wall_seconds, 3),
+        "errors": sum(1 for s in per_session if s["error"]),
+        "rerun_latency": {
+            "all": percentile_summary([run["latency"] for run in all_runs]),
+            "step": percentile_summary([run["latency"] for run in all_runs if run["phase"] == "step"]),
+            "play": percentile_summary([run["latency"] for run in all_runs if run["phase"] == "play"]),
+        },
+        "frame_kib": frame_size_summary(all_runs),
+        "frame_ms": frame_time_summary(all_runs),
+        "fps": {
+            "mean_achieved": round(statistics.fmean(achieved), 2) if achieved else None,
+            "mean_target": round(statistics.fmean(s["target_fps"] for s in per_session), 2),
+            "by_play_speed": {
+                str(speed): {
+                    "target_fps": round(target_fps(speed), 2),
+                    "achieved_fps": [s["achieved_fps"] for s in per_session if s["play_speed"] == speed],
+                }
+                for speed in PLAY_SPEEDS
+                if any(s["play_speed"] == speed for s in per_session)
+            },
+        },
+        "cpu": {
+            "process_seconds": round(cpu_seconds, 3),
+            "render_worker_seconds": round(worker_cpu_seconds, 3),
+            "per_session_seconds": round(server_cpu_seconds / args.sessions, 3),
+            "utilisation": round(server_cpu_seconds / wall_seconds / (os.cpu_count() or 1), 3),
+        },
+        "rss": {
+            "baseline_mib": round(baseline_rss / mib, 1),
+            "peak_mib": round(sampler.peak / mib, 1),
+            "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "per_session_mib": round(rss_growth / args.sessions / mib, 2),
+        },
+        "render_service": service_stats,
+        "sessions": per_session,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the sea slug Streamlit app with concurrent sessions.")
+    parser.add_argument("--sessions", type=int, default=4, help="Number of concurrent sessions")
+    parser.add_argument("--play-frames", type=int, default=30,
+                        help="Frames each session plays in autoplay before the pattern completes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mix of session settings")
+    parser.add_argument("--timeout", type=float, default=600,
+                        help="Per-interaction timeout in seconds (autoplay runs in a single interaction)")
+    parser.add_argument("--output", default="loadtest_report.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+    if args.sessions < 1:
+        parser.error("--sessions must be at least 1")
+
+    report = run_load_test(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    latency = report["rerun_latency"]["all"]
+    print(f"{args.sessions} sessions, {latency['count']} reruns in {report['wall_seconds']}s "
+          f"({report['errors']} errors)")
+    print(f"Rerun latency p50 {latency.get('p50_ms')} ms, p95 {latency.get('p95_ms')} ms, "
+          f"p99 {latency.get('p99_ms')} ms")
+    print(f"FPS achieved {report['fps']['mean_achieved']} vs target {report['fps']['mean_target']}")
+    print(f"CPU {report['cpu']['per_session_seconds']}s and RSS {report['rss']['per_session_mib']} MiB per session")
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
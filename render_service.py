@@ -0,0 +1,416 @@
+"""
+Out-of-process render service shared by every Streamlit session.
+
+Matplotlib rendering holds the GIL, so rendering on each session's script
+thread lets one busy session slow every other session's reruns. This module
+renders frames in a pool of worker processes, each fed through its own
+pipe, instead. Identical in-flight jobs are rendered once, each session
+has a bounded queue that is drained round-robin so no session can starve
+the others, and the service rejects work when the shared queue is full.
+"""
+
+import atexit
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+import types
+import zlib
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from multiprocessing.connection import wait
+
+RenderJob = namedtuple("RenderJob", ["settings", "seed", "step", "quality", "dpi"])
+RenderedFrame = namedtuple("RenderedFrame", ["png_bytes", "render_seconds", "wait_seconds", "worker_id"])
+
+MAX_CACHED_VISUALIZERS = 32   # Per worker, keyed by settings
+
+
+class RenderServiceBusy(Exception):
+    """Raised when a job is rejected or dropped to relieve back-pressure."""
+
+
+class RenderError(Exception):
+    """Raised when a worker fails to render a job."""
+
+
+# --- Worker process ---
+
+def _worker_main(worker_id, conn):
+    """Renders jobs received on a pipe until it receives None or the pipe closes."""
+    from egg_visualizer import EggLayingVisualizer, render_frame
+    from sea_slugs import SEA_SLUG_SPECIES
+
+    slugs = {slug.species: slug for slug in SEA_SLUG_SPECIES.values()}
+    visualizers = OrderedDict()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        try:
+            visualizer = visualizers.get(job.settings)
+            if visualizer is None:
+                species, substrate, temperature, flow_rate = job.settings
+                visualizer = EggLayingVisualizer(slugs[species], substrate, temperature, flow_rate)
+                visualizers[job.settings] = visualizer
+                if len(visualizers) > MAX_CACHED_VISUALIZERS:
+                    visualizers.popitem(last=False)
+            visualizers.move_to_end(job.settings)
+
+            # Seed the random textures so identical jobs give identical frames
+            random.seed(zlib.crc32(repr((job.seed, job.step)).encode()))
+            png_bytes, render_seconds = render_frame(visualizer, job.step, job.quality, job.dpi)
+            conn.send(("done", job, (png_bytes, render_seconds, time.process_time())))
+        except Exception as exc:
+            conn.send(("failed", job, f"{type(exc).__name__}: {exc}"))
+
+
+@contextmanager
+def _hidden_main_module():
+    """
+    Streamlit runs the app script as __main__, and spawned processes re-run
+    __main__ on startup. Hide it while starting a worker so the worker only
+    imports the modules it renders with.
+    """
+    main_module = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main_module
+
+
+class WorkerStats:
+    """Bookkeeping for one worker process and the job it has been handed."""
+    def __init__(self, worker_id, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.started = time.perf_counter()
+        self.jobs = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.current_job = None
+
+    def summary(self):
+        uptime = max(1e-9, time.perf_counter() - self.started)
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.process.pid,
+            "alive": self.process.is_alive(),
+            "jobs": self.jobs,
+            "failures": self.failures,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "frames_per_second": round(self.jobs / uptime, 2),
+            "utilisation": round(min(1.0, self.busy_seconds / uptime), 3),
+        }
+
+
+class _SubmittedJob:
+    """
+    One submission of a job: its Future, and how many requests from each
+    session wait on it. Queues and workers hold the submission itself, so a
+    run that outlives its submission (after a timeout) cannot resolve a newer
+    submission of the same job.
+    """
+    def __init__(self, job):
+        self.job = job
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+        self.waiters = Counter()
+
+
+# --- Service ---
+
+class RenderService:
+    """
+    Pool of render worker processes with per-session fair queuing.
+
+    submit() returns a Future for a RenderJob. Jobs wait in per-session
+    queues and are handed to idle workers round-robin across sessions, one
+    job per worker at a time, so a session with many queued frames cannot
+    delay another session's next frame by more than one job. Each worker
+    has its own pipe, so the service always knows which job a worker holds
+    and can fail it if the worker dies.
+    """
+
+    def __init__(self, num_workers=None, max_queue_depth=64, max_pending_per_session=2):
+        self.num_workers = num_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_queue_depth = max_queue_depth
+        self.max_pending_per_session = max_pending_per_session
+
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()   # session_id -> deque of queued _SubmittedJobs
+        self._submitted = {}            # job -> current _SubmittedJob while queued or running
+        self._stopping = False
+        self.deduplicated = 0
+        self.rejected = 0
+        self.superseded = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+        self._workers = {}
+        for worker_id in range(self.num_workers):
+            self._start_worker(worker_id)
+        self._collector = threading.Thread(target=self._collect_results, name="render-service-collector", daemon=True)
+        self._collector.start()
+
+    def _start_worker(self, worker_id):
+        conn, worker_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, worker_conn),
+            name=f"render-worker-{worker_id}",
+            daemon=True,
+        )
+        with _hidden_main_module():
+            process.start()
+        worker_conn.close()
+        self._workers[worker_id] = WorkerStats(worker_id, process, conn)
+
+    # --- Submitting ---
+
+    def submit(self, session_id, job):
+        """
+        Queues a job for a session and returns a Future of a RenderedFrame.
+        Raises RenderServiceBusy when the shared queue is full.
+        """
+        dropped = None
+        with self._lock:
+            submitted = self._submitted.get(job)
+            if submitted is not None:
+                submitted.waiters[session_id] += 1
+                self.deduplicated += 1
+                return submitted.future
+            if self.queue_depth() >= self.max_queue_depth:
+                self.rejected += 1
+                raise RenderServiceBusy(f"Render queue is full ({self.max_queue_depth} jobs)")
+
+            session_queue = self._pending.setdefault(session_id, deque())
+            if len(session_queue) >= self.max_pending_per_session:
+                # Drop the session's oldest queued frame that no other session is waiting on;
+                # frames other sessions share stay queued even past the per-session limit
+                oldest = next((queued for queued in session_queue
+                               if queued.waiters.keys() <= {session_id}), None)
+                if oldest is not None:
+                    session_queue.remove(oldest)
+                    self._forget(oldest)
+                    dropped = oldest.future
+                    self.superseded += 1
+
+            submitted = _SubmittedJob(job)
+            submitted.waiters[session_id] += 1
+            self._submitted[job] = submitted
+            session_queue.append(submitted)
+            self._dispatch()
+
+        if dropped is not None:
+            dropped.set_exception(RenderServiceBusy("Superseded by a newer frame from the same session"))
+        return submitted.future
+
+    def render(self, session_id, job, timeout=None):
+        """
+        Submits a job and waits for its RenderedFrame. On timeout the session
+        stops waiting, and the job is forgotten once no other session waits on it.
+        """
+        future = self.submit(session_id, job)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self._abandon(session_id, job, future)
+            raise
+
+    def _abandon(self, session_id, job, future):
+        """Removes one session's wait on a job, dropping the job when nobody waits on it."""
+        with self._lock:
+            submitted = self._submitted.get(job)
+            if submitted is None or submitted.future is not future:
+                return
+            submitted.waiters[session_id] -= 1
+            if submitted.waiters[session_id] <= 0:
+                del submitted.waiters[session_id]
+            if submitted.waiters:
+                return
+            # A running job finishes, but its frame is discarded
+            self._forget(submitted)
+            for owner, session_queue in self._pending.items():
+                if submitted in session_queue:
+                    session_queue.remove(submitted)
+                    if not session_queue:
+                        del self._pending[owner]
+                    break
+
+    def _forget(self, submitted):
+        """Stops deduplicating onto a submission, unless a newer one has replaced it. Call with the lock held."""
+        if self._submitted.get(submitted.job) is submitted:
+            del self._submitted[submitted.job]
+
+    def _dispatch(self):
+        """Hands queued jobs to idle workers, one session at a time. Call with the lock held."""
+        idle = deque(worker for worker in self._workers.values() if worker.current_job is None)
+        while idle and self._pending:
+            session_id, session_queue = next(iter(self._pending.items()))
+            submitted = session_queue.popleft()
+            if session_queue:
+                self._pending.move_to_end(session_id)
+            else:
+                del self._pending[session_id]
+            worker = idle.popleft()
+            worker.current_job = submitted
+            try:
+                worker.conn.send(submitted.job)
+            except OSError:
+                pass  # The worker has died; the collector fails the job when it replaces it
+
+    # --- Results ---
+
+    def _collect_results(self):
+        """Receives results, and replaces dead workers as soon as their process exits."""
+        while not self._stopping:
+            with self._lock:
+                workers = list(self._workers.values())
+            try:
+                ready = set(wait([worker.conn for worker in workers] +
+                                 [worker.process.sentinel for worker in workers], timeout=0.5))
+            except OSError:
+                break  # Shutting down
+            # Read results first, so a worker that finished a job and then exited is credited with it
+            for worker in workers:
+                if worker.conn in ready:
+                    self._receive(worker)
+            for worker in workers:
+                if worker.process.sentinel in ready:
+                    self._replace_dead_worker(worker)
+
+    def _receive(self, worker):
+        while True:
+            try:
+                if not worker.conn.poll():
+                    return
+                kind, _, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                return
+
+            with self._lock:
+                submitted, worker.current_job = worker.current_job, None
+                if submitted is not None:
+                    self._forget(submitted)
+                if kind == "done":
+                    png_bytes, render_seconds, cpu_seconds = payload
+                    worker.jobs += 1
+                    worker.busy_seconds += render_seconds
+                    worker.cpu_seconds = cpu_seconds
+                    self.completed += 1
+                else:
+                    worker.failures += 1
+                    self.failed += 1
+                self._dispatch()
+
+            if submitted is None:
+                continue
+            if kind == "done":
+                wait_seconds = time.perf_counter() - submitted.submitted_at
+                submitted.future.set_result(RenderedFrame(png_bytes, render_seconds, wait_seconds, worker.worker_id))
+            else:
+                submitted.future.set_exception(RenderError(payload))
+
+    def _replace_dead_worker(self, worker):
+        """Restarts a crashed worker and fails the job it was rendering."""
+        worker.process.join(timeout=1)
+        with self._lock:
+            if self._stopping or self._workers.get(worker.worker_id) is not worker:
+                return
+            lost, worker.current_job = worker.current_job, None
+            if lost is not None:
+                self._forget(lost)
+                self.failed += 1
+            worker.conn.close()
+            self.restarts += 1
+            self._start_worker(worker.worker_id)
+            self._dispatch()
+        if lost is not None:
+            lost.future.set_exception(RenderError(f"Render worker exited with code {worker.process.exitcode}"))
+
+    # --- Monitoring ---
+
+    def queue_depth(self):
+        """Number of jobs waiting for a worker."""
+        return sum(len(session_queue) for session_queue in self._pending.values())
+
+    def worker_pids(self):
+        with self._lock:
+            return [worker.process.pid for worker in self._workers.values()]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "queue_depth": self.queue_depth(),
+                "in_flight": sum(worker.current_job is not None for worker in self._workers.values()),
+                "sessions_waiting": len(self._pending),
+                "completed": self.completed,
+                "failed": self.failed,
+                "deduplicated": self.deduplicated,
+                "rejected": self.rejected,
+                "superseded": self.superseded,
+                "restarts": self.restarts,
+                "per_worker": [worker.summary() for worker in self._workers.values()],
+            }
+
+    def shutdown(self):
+        """Stops the workers, failing any jobs that have not finished."""
+        with self._lock:
+            if self._stopping:
+                return
+            self._stopping = True
+            abandoned = [submitted.future for submitted in self._submitted.values()]
+            self._submitted.clear()
+            self._pending.clear()
+            workers = list(self._workers.values())
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._collector.join(timeout=2)
+        for worker in workers:
+            worker.conn.close()
+        for future in abandoned:
+            if not future.done():
+                future.set_exception(RenderServiceBusy("Render service shut down"))
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """
+    Returns the process-wide render service, starting it on first use.
+    The worker count can be set with SEA_SLUG_RENDER_WORKERS.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RenderService(num_workers=int(os.environ.get("SEA_SLUG_RENDER_WORKERS", 0)) or None)
+            atexit.register(_service.shutdown)
+        return _service
+
+
+def running_service():
+    """Returns the render service if it has been started, otherwise None."""
+    return _service
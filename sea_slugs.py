@@ -0,0 +1,180 @@
+"""
+Sea slug species and their egg masses.
+
+Streamlit is only imported by the methods that narrate to the page, so the
+render workers can load the species without it.
+"""
+
+import random
+
+class SeaSlug:
+    """
+    Represents a sea slug with specific reproductive characteristics.
+    """
+    def __init__(self, species, egg_count_range, egg_mass_shape, coiling_direction,
+                 hatching_time_range, larval_type, is_toxic, preferred_substrate):
+        self.species = species
+        self.egg_count_range = egg_count_range  # (min, max) eggs
+        self.egg_mass_shape = egg_mass_shape    # e.g., "spiral ribbon", "globular jelly mass", "flat sheet"
+        self.coiling_direction = coiling_direction # e.g., "anticlockwise", "clockwise", "pseudodextral", "N/A"
+        self.hatching_time_range = hatching_time_range # (min_days, max_days)
+        self.larval_type = larval_type          # "planktotrophic veliger" or "lecithotrophic juvenile"
+        self.is_toxic = is_toxic                # Boolean
+        self.preferred_substrate = preferred_substrate # e.g., "rocks", "seaweed", "sediment"
+
+    def mate(self, other_slug):
+        """
+        Simulates mating between two hermaphroditic sea slugs.
+        Both slugs can become fertilized and lay eggs.
+        """
+        import streamlit as st
+
+        st.write(f"The {self.species} and {other_slug.species} are engaging in courtship and mating. Both are hermaphroditic and can lay eggs. [2, 3, 4]")
+        return True
+
+    def lay_eggs(self, substrate, temperature_celsius, water_flow_rate):
+        """
+        Simulates the process of a sea slug laying an egg mass.
+        The process involves internal fertilization, secretion of gelatinous matrix,
+        and physical shaping by the slug.
+        """
+        import streamlit as st
+
+        if substrate not in self.preferred_substrate:
+            st.warning(f"Warning: {self.species} prefers {self.preferred_substrate} but is laying on {substrate}. This might affect egg mass stability. [5, 6]")
+
+        num_eggs = random.randint(self.egg_count_range[0], self.egg_count_range[1])
+        
+        # Simulate the physical shaping of the egg mass
+        st.write(f"The {self.species} begins extruding a continuous stream of fertilized eggs and gelatinous matrix from its genital aperture. [7, 8, 9]")
+        st.write(f"Using its muscular foot and mantle edge, the slug actively manipulates and presses the material against the substrate, sculpting it into a **{self.egg_mass_shape}** with a **{self.coiling_direction}** coiling direction. [6, 10]")
+        
+        # Determine hatching time, influenced by temperature
+        base_hatching_days = random.randint(self.hatching_time_range[0], self.hatching_time_range[1])
+        
+        # Temperature effect: warmer water generally accelerates development
+        # Simplified model: -1 day for every 2 degrees above 20C, +1 day for every 2 degrees below 20C
+        temperature_adjustment = (temperature_celsius - 20) // 2
+        adjusted_hatching_days = max(5, base_hatching_days - temperature_adjustment) # Minimum 5 days [11, 12]
+
+        egg_mass = EggMass(
+            species=self.species,
+            num_eggs=num_eggs,
+            shape=self.egg_mass_shape,
+            coiling_direction=self.coiling_direction,
+            hatching_day=adjusted_hatching_days,
+            larval_type=self.larval_type,
+            is_toxic=self.is_toxic,
+            substrate=substrate
+        )
+        st.success(f"A new egg mass of **{num_eggs:,}** eggs has been laid by the **{self.species}** on the **{substrate}**. It is a **{egg_mass.shape}** and will hatch in approximately **{egg_mass.hatching_day}** days (adjusted for {temperature_celsius}°C). [5, 13]")
+        if egg_mass.is_toxic:
+            st.info(f"This egg mass incorporates defensive toxins from the parent, deterring predators. [11, 12, 14, 15]")
+        return egg_mass
+
+class EggMass:
+    """
+    Represents a sea slug egg mass and simulates its development.
+    """
+    def __init__(self, species, num_eggs, shape, coiling_direction, hatching_day, larval_type, is_toxic, substrate):
+        self.species = species
+        self.num_eggs = num_eggs
+        self.shape = shape
+        self.coiling_direction = coiling_direction
+        self.hatching_day = hatching_day
+        self.larval_type = larval_type
+        self.is_toxic = is_toxic
+        self.substrate = substrate
+        self.current_day = 0
+        self.hatched = False
+        self.survival_rate = 1.0 # Initial survival rate
+
+    def simulate_development(self, current_day, temperature_celsius, water_flow_rate):
+        """
+        Simulates the daily development of the egg mass, considering environmental factors.
+        """
+        import streamlit as st
+
+        self.current_day = current_day
+        st.markdown(f"### Day {self.current_day}")
+        st.write(f"The **{self.species}** egg mass ({self.shape}, {self.num_eggs:,} eggs) on {self.substrate} is developing.")
+
+        # Oxygen diffusion impact (simplified) [16, 17, 18, 19, 20, 21, 22]
+        # Larger/denser masses in low flow or high temperature can experience hypoxia.
+        oxygen_stress_factor = 0
+        if self.num_eggs > 100000 and water_flow_rate < 0.5: # Arbitrary threshold for "large/dense" and "low flow"
+            oxygen_stress_factor += 0.1
+        if temperature_celsius > 25: # High temperature increases metabolic demand
+            oxygen_stress_factor += 0.05
+        
+        if oxygen_stress_factor > 0:
+            self.survival_rate -= (oxygen_stress_factor * 0.1) # Small daily reduction
+            self.survival_rate = max(0, self.survival_rate)
+            st.warning(f"Oxygen diffusion is a challenge due to environmental conditions (temp: {temperature_celsius}°C, flow: {water_flow_rate}). Current survival rate: {self.survival_rate:.2f}. [16, 17, 18, 19, 23, 20, 21, 22]")
+
+        if self.current_day >= self.hatching_day and not self.hatched:
+            num_surviving_eggs = int(self.num_eggs * self.survival_rate)
+            st.success(f"The egg mass has reached its hatching day! Approximately **{num_surviving_eggs:,}** embryos are hatching. [5, 12]")
+            if self.larval_type == "planktotrophic veliger":
+                st.write(f"They are hatching as free-swimming, microscopic **veliger larvae**, entering the plankton for dispersal. Unfortunately, only a few of these will likely survive to adulthood. [5, 9]")
+            else: # lecithotrophic juvenile
+                st.write(f"They are hatching as small, crawling **juveniles**, resembling miniature adults. This direct development offers higher survival rates for fewer offspring. [5, 12]")
+            self.hatched = True
+        elif self.current_day < self.hatching_day:
+            st.write(f"Embryos are developing within the gelatinous matrix. Hatching expected in {self.hatching_day - self.current_day} days.")
+            # Simulate embryonic stages (simplified)
+            if self.current_day == 1:
+                st.write("Initial cleavage and gastrulation are underway. [8, 24, 25]")
+            elif self.current_day == self.hatching_day // 2:
+                st.write("Embryos are progressing to the trochophore stage, developing cilia and beginning to rotate within their capsules. [8, 9, 18]")
+            elif self.current_day == self.hatching_day - 2:
+                st.write("Embryos are in the late veliger stage, developing prominent cilia and rotating vigorously. [9, 18]")
+        else:
+            st.info("The egg mass has already hatched.")
+
+# --- Species ---
+
+# Define some sea slug species with their characteristics based on research
+# Using a dictionary for easy lookup in Streamlit selectbox
+SEA_SLUG_SPECIES = {
+    "Pacific Sea Lemon (Peltodoris nobilis)": SeaSlug(
+        species="Pacific Sea Lemon (Peltodoris nobilis)",
+        egg_count_range=(100000, 2000000), # Up to 20 eggs per dot, large mass [26, 27, 7]
+        egg_mass_shape="large spiral ribbon",
+        coiling_direction="anticlockwise", # Typically anticlockwise from center [6, 28]
+        hatching_time_range=(20, 40), # Weeks to months for veliger stage [5]
+        larval_type="planktotrophic veliger", # Most species hatch as veligers [5, 12]
+        is_toxic=False, # Not explicitly mentioned as toxic in snippets, but some dorids are [29]
+        preferred_substrate=["rocks", "seaweed"] # Often attached to rocks or seaweed [5, 4, 30]
+    ),
+    "Spanish Dancer Nudibranch (Hexabranchus sanguineus)": SeaSlug(
+        species="Spanish Dancer Nudibranch (Hexabranchus sanguineus)",
+        egg_count_range=(500000, 5000000), # Large and numerous [27, 31, 9]
+        egg_mass_shape="ruffled spiral ribbon (rose-like)",
+        coiling_direction="N/A", # Not specified, but often rose-like [14]
+        hatching_time_range=(10, 30), # General range for nudibranchs [5, 12]
+        larval_type="planktotrophic veliger",
+        is_toxic=True, # Incorporates defense toxins [11, 12, 14, 15]
+        preferred_substrate=["rocks", "seaweed", "coral"] # Often laid on food source, but not specified for this species [27]
+    ),
+    "Vayssierea felis": SeaSlug(
+        species="Vayssierea felis",
+        egg_count_range=(1, 5), # As few as 1-2 eggs
+        egg_mass_shape="cluster", # Not explicitly spiral for this species, often small clusters [5]
+        coiling_direction="N/A",
+        hatching_time_range=(30, 50), # Longer development for direct developers
+        larval_type="lecithotrophic juvenile", # Few large eggs hatch as crawling slugs [5, 12]
+        is_toxic=False, # Not specified
+        preferred_substrate=["not specified", "algae", "sediment"]
+    ),
+    "Aglajid Sea Slug (e.g., Spotted Aglajid)": SeaSlug(
+        species="Aglajid Sea Slug",
+        egg_count_range=(1000, 100000), # Variable, but can be numerous [32]
+        egg_mass_shape="coil or tube-like mass",
+        coiling_direction="around rotating body", # Unique method [7]
+        hatching_time_range=(10, 25),
+        larval_type="planktotrophic veliger",
+        is_toxic=False,
+        preferred_substrate=["sediment"] # Anchored in sediment [7]
+    )
+}
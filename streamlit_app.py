@@ -1,467 +1,99 @@
 import streamlit as st
 import random
-import matplotlib.pyplot as plt
 import numpy as np
 import time
-from matplotlib.patches import Circle, Ellipse, FancyBboxPatch
-import matplotlib.patches as patches
+import uuid
+import zlib
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from egg_tiles import EggTilePyramid, MAX_LEVEL, WORLD_SIZE_CM
+from egg_visualizer import EggLayingVisualizer, FULL_QUALITY_DPI, PREVIEW_TIMING_SAMPLES, choose_preview_dpi
+from render_service import RenderError, RenderJob, RenderServiceBusy, get_service
+from sea_slugs import SEA_SLUG_SPECIES
 
-# --- Existing SeaSlug and EggMass Classes ---
+RENDER_TIMEOUT = 60  # Seconds to wait for the render service before giving up
 
-class SeaSlug:
+# --- Frame Rendering ---
+
+def autoplay_delay(play_speed):
+    """Seconds between autoplay frames at the given playback speed."""
+    return max(0.1, 0.3 / play_speed)
+
+def settings_seed(settings):
+    """Stable seed for a settings tuple, so every session sees the same egg mass."""
+    return zlib.crc32(repr(settings).encode())
+
+def show_frame(settings, step, quality, dpi):
     """
-    Represents a sea slug with specific reproductive characteristics.
+    Renders a frame on the render service and displays it, reporting its
+    resolution and size. Returns "shown", "busy" if the service was too busy
+    to take it (worth retrying shortly), or "failed" if the frame could not
+    be rendered, in which case an error and a Retry button are shown.
     """
-    def __init__(self, species, egg_count_range, egg_mass_shape, coiling_direction,
-                 hatching_time_range, larval_type, is_toxic, preferred_substrate):
-        self.species = species
-        self.egg_count_range = egg_count_range  # (min, max) eggs
-        self.egg_mass_shape = egg_mass_shape    # e.g., "spiral ribbon", "globular jelly mass", "flat sheet"
-        self.coiling_direction = coiling_direction # e.g., "anticlockwise", "clockwise", "pseudodextral", "N/A"
-        self.hatching_time_range = hatching_time_range # (min_days, max_days)
-        self.larval_type = larval_type          # "planktotrophic veliger" or "lecithotrophic juvenile"
-        self.is_toxic = is_toxic                # Boolean
-        self.preferred_substrate = preferred_substrate # e.g., "rocks", "seaweed", "sediment"
-
-    def mate(self, other_slug):
-        """
-        Simulates mating between two hermaphroditic sea slugs.
-        Both slugs can become fertilized and lay eggs.
-        """
-        st.write(f"The {self.species} and {other_slug.species} are engaging in courtship and mating. Both are hermaphroditic and can lay eggs. [2, 3, 4]")
-        return True
-
-    def lay_eggs(self, substrate, temperature_celsius, water_flow_rate):
-        """
-        Simulates the process of a sea slug laying an egg mass.
-        The process involves internal fertilization, secretion of gelatinous matrix,
-        and physical shaping by the slug.
-        """
-        if substrate not in self.preferred_substrate:
-            st.warning(f"Warning: {self.species} prefers {self.preferred_substrate} but is laying on {substrate}. This might affect egg mass stability. [5, 6]")
-
-        num_eggs = random.randint(self.egg_count_range[0], self.egg_count_range[1])
-        
-        # Simulate the physical shaping of the egg mass
-        st.write(f"The {self.species} begins extruding a continuous stream of fertilized eggs and gelatinous matrix from its genital aperture. [7, 8, 9]")
-        st.write(f"Using its muscular foot and mantle edge, the slug actively manipulates and presses the material against the substrate, sculpting it into a **{self.egg_mass_shape}** with a **{self.coiling_direction}** coiling direction. [6, 10]")
-        
-        # Determine hatching time, influenced by temperature
-        base_hatching_days = random.randint(self.hatching_time_range[0], self.hatching_time_range[1])
-        
-        # Temperature effect: warmer water generally accelerates development
-        # Simplified model: -1 day for every 2 degrees above 20C, +1 day for every 2 degrees below 20C
-        temperature_adjustment = (temperature_celsius - 20) // 2
-        adjusted_hatching_days = max(5, base_hatching_days - temperature_adjustment) # Minimum 5 days [11, 12]
-
-        egg_mass = EggMass(
-            species=self.species,
-            num_eggs=num_eggs,
-            shape=self.egg_mass_shape,
-            coiling_direction=self.coiling_direction,
-            hatching_day=adjusted_hatching_days,
-            larval_type=self.larval_type,
-            is_toxic=self.is_toxic,
-            substrate=substrate
-        )
-        st.success(f"A new egg mass of **{num_eggs:,}** eggs has been laid by the **{self.species}** on the **{substrate}**. It is a **{egg_mass.shape}** and will hatch in approximately **{egg_mass.hatching_day}** days (adjusted for {temperature_celsius}°C). [5, 13]")
-        if egg_mass.is_toxic:
-            st.info(f"This egg mass incorporates defensive toxins from the parent, deterring predators. [11, 12, 14, 15]")
-        return egg_mass
-
-class EggMass:
+    job = RenderJob(settings, settings_seed(settings), step, quality, dpi)
+    try:
+        frame = get_service().render(st.session_state.session_id, job, timeout=RENDER_TIMEOUT)
+    except RenderServiceBusy as exc:
+        st.info(f"Waiting for the render service: {exc}")
+        return "busy"
+    except FutureTimeoutError:
+        st.error(f"The render service did not return this frame within {RENDER_TIMEOUT} s.")
+        st.button("Retry", key="retry_frame")
+        return "failed"
+    except RenderError as exc:
+        st.error(f"This frame could not be rendered: {exc}")
+        st.button("Retry", key="retry_frame")
+        return "failed"
+    st.image(frame.png_bytes, use_container_width=True)
+    st.caption(f"{quality.title()} frame: {dpi} DPI, {len(frame.png_bytes) / 1024:.0f} KB, "
+               f"rendered in {frame.render_seconds * 1000:.0f} ms by worker {frame.worker_id}, "
+               f"{frame.wait_seconds * 1000:.0f} ms end to end")
+    st.session_state.last_frame = {
+        "quality": quality,
+        "dpi": dpi,
+        "bytes": len(frame.png_bytes),
+        "render_seconds": frame.render_seconds,
+        "wait_seconds": frame.wait_seconds,
+    }
+    if quality == "preview":
+        # Keep the latest render time per DPI for the preview DPI picker
+        timings = st.session_state.preview_timings
+        timings.pop(dpi, None)
+        timings[dpi] = frame.render_seconds
+        while len(timings) > PREVIEW_TIMING_SAMPLES:
+            del timings[next(iter(timings))]
+    return "shown"
+
+# Each pyramid holds 16 bytes per egg (up to ~80 MB for the largest masses); rendered tiles
+# live in egg_tiles.shared_tile_cache, which is bounded separately
+@st.cache_resource(max_entries=4, show_spinner="Laying out every egg for the zoom view...")
+def get_tile_pyramid(_visualizer, species, substrate):
     """
-    Represents a sea slug egg mass and simulates its development.
+    Tile pyramid for the visualizer's egg mass. Only the species and substrate
+    change the layout, so sessions share it across temperature and flow settings.
     """
-    def __init__(self, species, num_eggs, shape, coiling_direction, hatching_day, larval_type, is_toxic, substrate):
-        self.species = species
-        self.num_eggs = num_eggs
-        self.shape = shape
-        self.coiling_direction = coiling_direction
-        self.hatching_day = hatching_day
-        self.larval_type = larval_type
-        self.is_toxic = is_toxic
-        self.substrate = substrate
-        self.current_day = 0
-        self.hatched = False
-        self.survival_rate = 1.0 # Initial survival rate
-
-    def simulate_development(self, current_day, temperature_celsius, water_flow_rate):
-        """
-        Simulates the daily development of the egg mass, considering environmental factors.
-        """
-        self.current_day = current_day
-        st.markdown(f"### Day {self.current_day}")
-        st.write(f"The **{self.species}** egg mass ({self.shape}, {self.num_eggs:,} eggs) on {self.substrate} is developing.")
-
-        # Oxygen diffusion impact (simplified) [16, 17, 18, 19, 20, 21, 22]
-        # Larger/denser masses in low flow or high temperature can experience hypoxia.
-        oxygen_stress_factor = 0
-        if self.num_eggs > 100000 and water_flow_rate < 0.5: # Arbitrary threshold for "large/dense" and "low flow"
-            oxygen_stress_factor += 0.1
-        if temperature_celsius > 25: # High temperature increases metabolic demand
-            oxygen_stress_factor += 0.05
-        
-        if oxygen_stress_factor > 0:
-            self.survival_rate -= (oxygen_stress_factor * 0.1) # Small daily reduction
-            self.survival_rate = max(0, self.survival_rate)
-            st.warning(f"Oxygen diffusion is a challenge due to environmental conditions (temp: {temperature_celsius}°C, flow: {water_flow_rate}). Current survival rate: {self.survival_rate:.2f}. [16, 17, 18, 19, 23, 20, 21, 22]")
-
-        if self.current_day >= self.hatching_day and not self.hatched:
-            num_surviving_eggs = int(self.num_eggs * self.survival_rate)
-            st.success(f"The egg mass has reached its hatching day! Approximately **{num_surviving_eggs:,}** embryos are hatching. [5, 12]")
-            if self.larval_type == "planktotrophic veliger":
-                st.write(f"They are hatching as free-swimming, microscopic **veliger larvae**, entering the plankton for dispersal. Unfortunately, only a few of these will likely survive to adulthood. [5, 9]")
-            else: # lecithotrophic juvenile
-                st.write(f"They are hatching as small, crawling **juveniles**, resembling miniature adults. This direct development offers higher survival rates for fewer offspring. [5, 12]")
-            self.hatched = True
-        elif self.current_day < self.hatching_day:
-            st.write(f"Embryos are developing within the gelatinous matrix. Hatching expected in {self.hatching_day - self.current_day} days.")
-            # Simulate embryonic stages (simplified)
-            if self.current_day == 1:
-                st.write("Initial cleavage and gastrulation are underway. [8, 24, 25]")
-            elif self.current_day == self.hatching_day // 2:
-                st.write("Embryos are progressing to the trochophore stage, developing cilia and beginning to rotate within their capsules. [8, 9, 18]")
-            elif self.current_day == self.hatching_day - 2:
-                st.write("Embryos are in the late veliger stage, developing prominent cilia and rotating vigorously. [9, 18]")
-        else:
-            st.info("The egg mass has already hatched.")
-
-# --- Visualization Class ---
-
-class EggLayingVisualizer:
+    rng = np.random.default_rng(settings_seed((species, substrate)))
+    min_eggs, max_eggs = _visualizer.sea_slug.egg_count_range
+    num_eggs = int(rng.integers(min_eggs, max_eggs + 1))
+    x, y, laid_at = _visualizer.egg_layout(num_eggs, rng)
+    return EggTilePyramid(x, y, laid_at,
+                          draw_background=partial(_visualizer._draw_substrate_overhead, detailed=False))
+
+def show_zoom_view(pyramid, step, total_steps, center_x, center_y, zoom):
     """
-    Creates bird's-eye view visualization of egg laying patterns being formed progressively.
+    Displays the visible tiles of the zoom view, reporting tile cache use.
+    Tiles missing from the cache are rendered here on the script thread, not
+    by the render service.
     """
-    
-    def __init__(self, sea_slug, substrate, temperature, flow_rate):
-        self.sea_slug = sea_slug
-        self.substrate = substrate
-        self.temperature = temperature
-        self.flow_rate = flow_rate
-        self.current_step = 0
-        self.total_steps = 100  # More steps for smoother pattern progression
-        self.center_x, self.center_y = 5, 5
-        self.egg_positions = []  # Track all laid eggs
-        self.slug_positions = []  # Track slug movement
-        
-    def get_step_info(self, step):
-        """Returns title and description for each step."""
-        progress = step / self.total_steps
-        if progress < 0.1:
-            return ("Positioning", "Sea slug finds optimal laying position")
-        elif progress < 0.2:
-            return ("First Contact", "Beginning to lay eggs and form matrix")
-        elif progress < 0.9:
-            return ("Pattern Formation", f"Actively creating {self.sea_slug.egg_mass_shape} pattern")
-        else:
-            return ("Completion", "Egg mass pattern complete")
-    
-    def create_visualization(self, step):
-        """Creates a bird's-eye view of the progressive egg laying pattern."""
-        fig, ax = plt.subplots(1, 1, figsize=(10, 10))
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 10)
-        ax.set_aspect('equal')
-        
-        # Set ocean-like background
-        ax.set_facecolor('#004466')
-        
-        # Draw substrate from bird's eye view
-        self._draw_substrate_overhead(ax)
-        
-        # Calculate current pattern progress
-        progress = step / self.total_steps
-        
-        # Generate and draw the egg laying pattern
-        if "spiral" in self.sea_slug.egg_mass_shape.lower():
-            self._draw_spiral_pattern(ax, progress)
-        elif "ribbon" in self.sea_slug.egg_mass_shape.lower():
-            self._draw_ribbon_pattern(ax, progress)
-        elif "cluster" in self.sea_slug.egg_mass_shape.lower():
-            self._draw_cluster_pattern(ax, progress)
-        else:
-            self._draw_coil_pattern(ax, progress)
-        
-        # Draw sea slug at current position
-        self._draw_slug_overhead(ax, progress)
-        
-        # Add grid and labels
-        ax.grid(True, alpha=0.2, color='white')
-        ax.set_title(f"Bird's Eye View: {self.get_step_info(step)[0]}", 
-                    fontsize=14, fontweight='bold', color='white')
-        ax.set_xlabel("Distance (cm)", fontsize=10, color='white')
-        ax.set_ylabel("Distance (cm)", fontsize=10, color='white')
-        
-        # Add environment info
-        self._add_environment_overlay(ax)
-        
-        return fig
-    
-    def _draw_substrate_overhead(self, ax):
-        """Draw substrate from overhead view."""
-        if self.substrate == "rock":
-            # Rocky surface with texture
-            rock = plt.Circle((self.center_x, self.center_y), 4, 
-                            facecolor='#666666', edgecolor='#444444', linewidth=2, alpha=0.8)
-            ax.add_patch(rock)
-            # Add rock texture spots
-            for i in range(15):
-                x = self.center_x + random.uniform(-3, 3)
-                y = self.center_y + random.uniform(-3, 3)
-                if (x - self.center_x)**2 + (y - self.center_y)**2 <= 16:  # Within rock
-                    spot = plt.Circle((x, y), random.uniform(0.1, 0.3), 
-                                    color='#555555', alpha=0.6)
-                    ax.add_patch(spot)
-        elif self.substrate == "seaweed":
-            # Seaweed fronds
-            for i in range(8):
-                angle = i * 45
-                x = self.center_x + 2 * np.cos(np.radians(angle))
-                y = self.center_y + 2 * np.sin(np.radians(angle))
-                frond = plt.Circle((x, y), 0.8, color='#2d5016', alpha=0.7)
-                ax.add_patch(frond)
-        else:
-            # Default substrate (sediment/coral)
-            substrate = plt.Circle((self.center_x, self.center_y), 3.5, 
-                                 facecolor='#8B7355', edgecolor='#654321', alpha=0.8)
-            ax.add_patch(substrate)
-    
-    def _draw_spiral_pattern(self, ax, progress):
-        """Draw progressive spiral egg laying pattern."""
-        # Spiral parameters
-        max_turns = 3 if "large" in self.sea_slug.egg_mass_shape else 2
-        max_radius = 2.5
-        
-        # Calculate how much of spiral to show
-        total_angle = max_turns * 2 * np.pi
-        current_angle = total_angle * progress
-        
-        # Generate spiral points
-        angles = np.linspace(0, current_angle, int(current_angle * 20))
-        
-        for i, angle in enumerate(angles):
-            radius = (angle / total_angle) * max_radius
-            x = self.center_x + radius * np.cos(angle)
-            y = self.center_y + radius * np.sin(angle)
-            
-            # Egg mass thickness varies along spiral
-            thickness = 0.15 + 0.1 * np.sin(angle * 2)
-            
-            # Color gradient from fresh (yellow) to older (orange)
-            age_factor = i / len(angles) if len(angles) > 0 else 0
-            color = plt.cm.YlOrRd(0.3 + 0.4 * age_factor)
-            
-            # Draw egg mass segment
-            egg_mass = plt.Circle((x, y), thickness, color=color, alpha=0.8)
-            ax.add_patch(egg_mass)
-            
-            # Add individual eggs within the mass
-            if i % 5 == 0:  # Every 5th segment
-                for j in range(3):
-                    egg_x = x + random.uniform(-thickness/2, thickness/2)
-                    egg_y = y + random.uniform(-thickness/2, thickness/2)
-                    egg = plt.Circle((egg_x, egg_y), 0.03, color='white', alpha=0.9)
-                    ax.add_patch(egg)
-        
-        # Current laying position (bright spot)
-        if progress > 0 and len(angles) > 0:
-            current_radius = (current_angle / total_angle) * max_radius
-            curr_x = self.center_x + current_radius * np.cos(current_angle)
-            curr_y = self.center_y + current_radius * np.sin(current_angle)
-            current_spot = plt.Circle((curr_x, curr_y), 0.2, color='#FFD700', alpha=1.0)
-            ax.add_patch(current_spot)
-    
-    def _draw_ribbon_pattern(self, ax, progress):
-        """Draw progressive ribbon egg laying pattern."""
-        # Ribbon parameters
-        ribbon_length = 4
-        waves = 2
-        
-        # Calculate current ribbon length
-        current_length = ribbon_length * progress
-        
-        # Generate ribbon points
-        t_values = np.linspace(0, current_length, int(current_length * 25))
-        
-        for i, t in enumerate(t_values):
-            # Sinusoidal ribbon path
-            x = self.center_x - 2 + t
-            y = self.center_y + 0.5 * np.sin(waves * np.pi * t / ribbon_length)
-            
-            # Ribbon width
-            width = 0.12 + 0.05 * np.sin(4 * np.pi * t / ribbon_length)
-            
-            # Color gradient
-            age_factor = i / len(t_values) if len(t_values) > 0 else 0
-            color = plt.cm.YlOrRd(0.2 + 0.5 * age_factor)
-            
-            # Draw ribbon segment
-            ribbon_seg = plt.Circle((x, y), width, color=color, alpha=0.8)
-            ax.add_patch(ribbon_seg)
-            
-            # Add eggs
-            if i % 4 == 0:
-                for j in range(2):
-                    egg_x = x + random.uniform(-width, width)
-                    egg_y = y + random.uniform(-width, width)
-                    egg = plt.Circle((egg_x, egg_y), 0.025, color='white', alpha=0.9)
-                    ax.add_patch(egg)
-        
-        # Current laying position
-        if progress > 0 and len(t_values) > 0:
-            current_t = current_length
-            curr_x = self.center_x - 2 + current_t
-            curr_y = self.center_y + 0.5 * np.sin(waves * np.pi * current_t / ribbon_length)
-            current_spot = plt.Circle((curr_x, curr_y), 0.15, color='#FFD700', alpha=1.0)
-            ax.add_patch(current_spot)
-    
-    def _draw_cluster_pattern(self, ax, progress):
-        """Draw progressive cluster egg laying pattern."""
-        max_clusters = 8
-        current_clusters = int(max_clusters * progress)
-        
-        # Predefined cluster positions
-        cluster_positions = []
-        for i in range(max_clusters):
-            angle = i * 2 * np.pi / max_clusters
-            radius = 1.5 + 0.5 * (i % 2)  # Alternating radii
-            x = self.center_x + radius * np.cos(angle)
-            y = self.center_y + radius * np.sin(angle)
-            cluster_positions.append((x, y))
-        
-        for i in range(current_clusters):
-            x, y = cluster_positions[i]
-            
-            # Cluster size varies
-            cluster_size = 0.2 + 0.1 * random.random()
-            
-            # Color based on order (older = more orange)
-            age_factor = i / max_clusters
-            color = plt.cm.YlOrRd(0.3 + 0.4 * age_factor)
-            
-            # Main cluster
-            cluster = plt.Circle((x, y), cluster_size, color=color, alpha=0.8)
-            ax.add_patch(cluster)
-            
-            # Individual eggs in cluster
-            for j in range(5):
-                egg_x = x + random.uniform(-cluster_size, cluster_size)
-                egg_y = y + random.uniform(-cluster_size, cluster_size)
-                egg = plt.Circle((egg_x, egg_y), 0.03, color='white', alpha=0.9)
-                ax.add_patch(egg)
-        
-        # Show next cluster position if in progress
-        if current_clusters < max_clusters:
-            next_x, next_y = cluster_positions[current_clusters]
-            next_spot = plt.Circle((next_x, next_y), 0.1, color='#FFD700', alpha=0.7)
-            ax.add_patch(next_spot)
-    
-    def _draw_coil_pattern(self, ax, progress):
-        """Draw progressive coil/tube pattern (for Aglajids)."""
-        # Coil parameters
-        coil_radius = 1.5
-        coil_height = 0.3
-        turns = 4
-        
-        # Current progress through coil
-        current_turn = turns * progress
-        
-        # Generate coil points
-        angles = np.linspace(0, current_turn * 2 * np.pi, int(current_turn * 30))
-        
-        for i, angle in enumerate(angles):
-            # Coil position
-            x = self.center_x + coil_radius * np.cos(angle)
-            y = self.center_y + coil_radius * np.sin(angle)
-            
-            # Add vertical component (simulated in 2D)
-            vertical_offset = coil_height * (angle / (2 * np.pi)) % coil_height
-            x += vertical_offset * 0.1  # Slight offset to show coiling
-            
-            # Tube thickness
-            thickness = 0.1
-            
-            # Color gradient
-            age_factor = i / len(angles) if len(angles) > 0 else 0
-            color = plt.cm.YlOrRd(0.3 + 0.4 * age_factor)
-            
-            # Draw tube segment
-            tube_seg = plt.Circle((x, y), thickness, color=color, alpha=0.8)
-            ax.add_patch(tube_seg)
-            
-            # Add eggs
-            if i % 6 == 0:
-                egg = plt.Circle((x, y), 0.02, color='white', alpha=0.9)
-                ax.add_patch(egg)
-        
-        # Current laying position
-        if progress > 0 and len(angles) > 0:
-            current_angle = current_turn * 2 * np.pi
-            curr_x = self.center_x + coil_radius * np.cos(current_angle)
-            curr_y = self.center_y + coil_radius * np.sin(current_angle)
-            current_spot = plt.Circle((curr_x, curr_y), 0.12, color='#FFD700', alpha=1.0)
-            ax.add_patch(current_spot)
-    
-    def _draw_slug_overhead(self, ax, progress):
-        """Draw sea slug from overhead view at current laying position."""
-        if "spiral" in self.sea_slug.egg_mass_shape.lower():
-            # Slug follows spiral path
-            max_turns = 3 if "large" in self.sea_slug.egg_mass_shape else 2
-            total_angle = max_turns * 2 * np.pi * progress
-            radius = (total_angle / (max_turns * 2 * np.pi)) * 2.5
-            slug_x = self.center_x + radius * np.cos(total_angle)
-            slug_y = self.center_y + radius * np.sin(total_angle)
-            slug_angle = total_angle + np.pi/2  # Perpendicular to spiral
-            
-        elif "ribbon" in self.sea_slug.egg_mass_shape.lower():
-            # Slug follows ribbon path
-            ribbon_length = 4 * progress
-            slug_x = self.center_x - 2 + ribbon_length
-            slug_y = self.center_y + 0.5 * np.sin(2 * np.pi * ribbon_length / 4)
-            slug_angle = 0  # Facing forward along ribbon
-            
-        else:
-            # Default positioning
-            slug_x, slug_y = self.center_x, self.center_y
-            slug_angle = 0
-        
-        # Draw slug body (elongated oval)
-        slug_length, slug_width = 0.6, 0.3
-        slug_body = Ellipse((slug_x, slug_y), slug_length, slug_width, 
-                          angle=np.degrees(slug_angle), 
-                          facecolor='orange', edgecolor='darkorange', alpha=0.9)
-        ax.add_patch(slug_body)
-        
-        # Draw tentacles/rhinophores
-        for offset in [-0.1, 0.1]:
-            tentacle_x = slug_x + 0.2 * np.cos(slug_angle) 
-            tentacle_y = slug_y + 0.2 * np.sin(slug_angle) + offset
-            tentacle = plt.Circle((tentacle_x, tentacle_y), 0.05, color='red', alpha=0.8)
-            ax.add_patch(tentacle)
-    
-    def _add_environment_overlay(self, ax):
-        """Add environmental condition indicators."""
-        # Temperature indicator (top-left) - using text instead of emoji
-        temp_color = '#ff4444' if self.temperature > 25 else '#4444ff' if self.temperature < 15 else '#44ff44'
-        ax.text(0.5, 9.5, f'TEMP: {self.temperature}°C', fontsize=12, color=temp_color, 
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
-        
-        # Flow indicator (top-right) - using arrows instead of emoji
-        flow_arrows = '→' * int(self.flow_rate * 5 + 1)
-        ax.text(8.5, 9.5, f'FLOW: {flow_arrows}', fontsize=12, color='#00aaff',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
-        
-        # Substrate indicator (bottom-left) - using text instead of emojis
-        substrate_names = {
-            'rock': 'ROCK', 
-            'seaweed': 'SEAWEED', 
-            'coral': 'CORAL',
-            'sediment': 'SEDIMENT'
-        }
-        substrate_text = substrate_names.get(self.substrate, 'SUBSTRATE')
-        ax.text(0.5, 0.5, f'{substrate_text}', fontsize=10, color='white',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='black', alpha=0.6))
+    start = time.perf_counter()
+    view, (level, tile_count) = pyramid.render_view(center_x, center_y, zoom, step / total_steps)
+    render_seconds = time.perf_counter() - start
+    st.image(view, use_container_width=True)
+    cache = pyramid.cache_info()
+    st.caption(f"Zoom view: {WORLD_SIZE_CM / 2 ** zoom:.3g} cm wide, {pyramid.num_eggs:,} eggs, "
+               f"{tile_count} level-{level} tiles in {render_seconds * 1000:.0f} ms • "
+               f"shared tile cache {cache['tiles']} tiles, {cache['mib']:.0f}/{cache['max_mib']:.0f} MiB "
+               f"({cache['hits']} hits, {cache['misses']} rendered, {cache['evictions']} evicted)")
 
 # --- Streamlit UI ---
 
@@ -474,50 +106,6 @@ from mating and egg laying to embryonic development and hatching,
 influenced by various environmental factors.
 """)
 
-# Define some sea slug species with their characteristics based on research
-# Using a dictionary for easy lookup in Streamlit selectbox
-SEA_SLUG_SPECIES = {
-    "Pacific Sea Lemon (Peltodoris nobilis)": SeaSlug(
-        species="Pacific Sea Lemon (Peltodoris nobilis)",
-        egg_count_range=(100000, 2000000), # Up to 20 eggs per dot, large mass [26, 27, 7]
-        egg_mass_shape="large spiral ribbon",
-        coiling_direction="anticlockwise", # Typically anticlockwise from center [6, 28]
-        hatching_time_range=(20, 40), # Weeks to months for veliger stage [5]
-        larval_type="planktotrophic veliger", # Most species hatch as veligers [5, 12]
-        is_toxic=False, # Not explicitly mentioned as toxic in snippets, but some dorids are [29]
-        preferred_substrate=["rocks", "seaweed"] # Often attached to rocks or seaweed [5, 4, 30]
-    ),
-    "Spanish Dancer Nudibranch (Hexabranchus sanguineus)": SeaSlug(
-        species="Spanish Dancer Nudibranch (Hexabranchus sanguineus)",
-        egg_count_range=(500000, 5000000), # Large and numerous [27, 31, 9]
-        egg_mass_shape="ruffled spiral ribbon (rose-like)",
-        coiling_direction="N/A", # Not specified, but often rose-like [14]
-        hatching_time_range=(10, 30), # General range for nudibranchs [5, 12]
-        larval_type="planktotrophic veliger",
-        is_toxic=True, # Incorporates defense toxins [11, 12, 14, 15]
-        preferred_substrate=["rocks", "seaweed", "coral"] # Often laid on food source, but not specified for this species [27]
-    ),
-    "Vayssierea felis": SeaSlug(
-        species="Vayssierea felis",
-        egg_count_range=(1, 5), # As few as 1-2 eggs
-        egg_mass_shape="cluster", # Not explicitly spiral for this species, often small clusters [5]
-        coiling_direction="N/A",
-        hatching_time_range=(30, 50), # Longer development for direct developers
-        larval_type="lecithotrophic juvenile", # Few large eggs hatch as crawling slugs [5, 12]
-        is_toxic=False, # Not specified
-        preferred_substrate=["not specified", "algae", "sediment"]
-    ),
-    "Aglajid Sea Slug (e.g., Spotted Aglajid)": SeaSlug(
-        species="Aglajid Sea Slug",
-        egg_count_range=(1000, 100000), # Variable, but can be numerous [32]
-        egg_mass_shape="coil or tube-like mass",
-        coiling_direction="around rotating body", # Unique method [7]
-        hatching_time_range=(10, 25),
-        larval_type="planktotrophic veliger",
-        is_toxic=False,
-        preferred_substrate=["sediment"] # Anchored in sediment [7]
-    )
-}
 
 # --- Sidebar for User Inputs ---
 st.sidebar.header("Simulation Parameters")
@@ -572,6 +160,54 @@ simulation_days = st.sidebar.number_input(
     help="Number of days to simulate egg mass development."
 )
 
+st.sidebar.subheader("Display")
+display_width = st.sidebar.number_input(
+    "Display Width Override (px):",
+    min_value=400,
+    max_value=3840,
+    value=1200,
+    step=100,
+    help="Manual setting: Streamlit cannot measure your browser's width, so the default of 1200 px is only a guess. Set this to roughly how wide the visualization appears on your screen. Autoplay frames are rendered at this resolution or lower so they keep up with the playback speed; paused frames are always full quality."
+)
+
+view_mode = st.sidebar.radio(
+    "View:",
+    ["Overview", "Zoom"],
+    horizontal=True,
+    help="Overview draws the whole pattern. Zoom lets you pan around the egg mass down to individual eggs."
+)
+
+if view_mode == "Zoom":
+    zoom_level = st.sidebar.slider(
+        "Zoom Level:",
+        min_value=0,
+        max_value=MAX_LEVEL - 1,
+        value=2,
+        help="Each level doubles the magnification. Low levels show egg density, high levels show individual eggs."
+    )
+    # Pan in quarter view widths, so panning moves the view by the same visible amount at every zoom
+    pan_step = WORLD_SIZE_CM / 2 ** zoom_level / 4
+    pan_format = f"%.{max(2, int(np.ceil(-np.log10(pan_step))) + 1)}f"
+    zoom_center = st.session_state.get("zoom_center", (WORLD_SIZE_CM / 2, WORLD_SIZE_CM / 2))
+    zoom_center_x, zoom_center_y = (
+        st.sidebar.slider(f"View Center {axis} (cm):", min_value=0.0, max_value=float(WORLD_SIZE_CM),
+                          value=float(round(center / pan_step) * pan_step), step=pan_step, format=pan_format,
+                          help="Steps by a quarter of the view width at the current zoom level.")
+        for axis, center in zip("XY", zoom_center)
+    )
+    st.session_state.zoom_center = (zoom_center_x, zoom_center_y)
+
+with st.sidebar.expander("Render Service"):
+    service_stats = get_service().stats()
+    st.write(f"Workers: {service_stats['workers']} • Queue depth: {service_stats['queue_depth']} • "
+             f"In flight: {service_stats['in_flight']}")
+    st.write(f"Frames: {service_stats['completed']} rendered, {service_stats['deduplicated']} deduplicated, "
+             f"{service_stats['superseded']} superseded, {service_stats['rejected']} rejected, "
+             f"{service_stats['failed']} failed")
+    for worker in service_stats["per_worker"]:
+        st.write(f"Worker {worker['worker_id']} (pid {worker['pid']}): {worker['jobs']} frames, "
+                 f"{worker['frames_per_second']} frames/s, {worker['utilisation']:.0%} busy")
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("### About the Simulator")
 st.sidebar.markdown("""
@@ -593,6 +229,12 @@ if 'visualizer' not in st.session_state:
     st.session_state.visualizer = None
 if 'play_speed' not in st.session_state:
     st.session_state.play_speed = 1.0
+if 'last_frame' not in st.session_state:
+    st.session_state.last_frame = None
+if 'preview_timings' not in st.session_state:
+    st.session_state.preview_timings = {}  # Preview DPI -> latest render seconds
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
 # Create visualization controls
 col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 1, 1, 1, 2])
@@ -649,6 +291,7 @@ if (st.session_state.visualizer is None or
         selected_slug, selected_substrate, temperature_celsius, water_flow_rate
     )
     st.session_state.last_settings = current_settings
+    st.session_state.preview_timings = {}
 
 # Display current step information
 step_title, step_description = st.session_state.visualizer.get_step_info(st.session_state.current_step)
@@ -661,29 +304,50 @@ viz_placeholder = st.empty()
 
 # Auto-play functionality with proper visualization updates
 if st.session_state.auto_play:
-    if st.session_state.current_step < 99:
-        # Update visualization immediately
+    # Each frame gets the autoplay delay as its budget, and only the remainder is slept
+    frame_budget = autoplay_delay(st.session_state.play_speed)
+    frame_started = time.perf_counter()
+    if st.session_state.current_step < 99 and view_mode == "Zoom":
         with viz_placeholder.container():
-            fig = st.session_state.visualizer.create_visualization(st.session_state.current_step)
-            st.pyplot(fig, use_container_width=True)
-            plt.close(fig)
-        
-        # Advance to next step
+            show_zoom_view(get_tile_pyramid(st.session_state.visualizer, selected_slug.species, selected_substrate),
+                           st.session_state.current_step, st.session_state.visualizer.total_steps,
+                           zoom_center_x, zoom_center_y, zoom_level)
+
         st.session_state.current_step += 1
+        time.sleep(max(0.0, frame_budget - (time.perf_counter() - frame_started)))
+        st.rerun()
+    elif st.session_state.current_step < 99:
+        # Update visualization immediately with a reduced-quality frame
+        preview_dpi = choose_preview_dpi(display_width, frame_budget, st.session_state.preview_timings.items())
+        with viz_placeholder.container():
+            frame_status = show_frame(current_settings, st.session_state.current_step, "preview", preview_dpi)
+        
+        # Advance to next step, or retry this one if the render service pushed back
+        if frame_status == "shown":
+            st.session_state.current_step += 1
         
-        # Small delay then rerun
-        time.sleep(max(0.1, 0.3 / st.session_state.play_speed))
+        if frame_status == "failed":
+            # Pause rather than retrying a frame that may keep failing; the paused view reports the error
+            st.session_state.auto_play = False
+        else:
+            # Wait out the rest of the frame budget, then rerun
+            time.sleep(max(0.0, frame_budget - (time.perf_counter() - frame_started)))
         st.rerun()
     else:
         st.session_state.auto_play = False
         st.success("Egg laying pattern complete!")
 
-# For non-autoplay mode, display static visualization
-if not st.session_state.auto_play:
+# For non-autoplay mode, display the zoom view or a full-quality static visualization
+if not st.session_state.auto_play and view_mode == "Zoom":
+    with viz_placeholder.container():
+        show_zoom_view(get_tile_pyramid(st.session_state.visualizer, selected_slug.species, selected_substrate),
+                       st.session_state.current_step, st.session_state.visualizer.total_steps,
+                       zoom_center_x, zoom_center_y, zoom_level)
+elif not st.session_state.auto_play:
     with viz_placeholder.container():
-        fig = st.session_state.visualizer.create_visualization(st.session_state.current_step)
-        st.pyplot(fig, use_container_width=True)
-        plt.close(fig)
+        if show_frame(current_settings, st.session_state.current_step, "full", FULL_QUALITY_DPI) == "busy":
+            time.sleep(0.5)
+            st.rerun()
 
 # Progress bar with animation indicator
 progress_value = (st.session_state.current_step + 1) / 100
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from egg_tiles import MAX_LEVEL, TILE_SIZE_PX, WORLD_SIZE_CM, EggTilePyramid, TileCache
+
+TILE_BYTES = TILE_SIZE_PX * TILE_SIZE_PX * 4
+
+
+def make_pyramid(x, y, laid_at, max_tiles=64):
+    return EggTilePyramid(x, y, laid_at, tile_cache=TileCache(max_bytes=max_tiles * TILE_BYTES))
+
+
+@pytest.fixture(scope="module")
+def scattered():
+    rng = np.random.default_rng(7)
+    x = rng.uniform(0, WORLD_SIZE_CM, 5000)
+    y = rng.uniform(0, WORLD_SIZE_CM, 5000)
+    return x, y, rng.random(5000)
+
+
+@pytest.mark.parametrize("level", [0, 1, 3, 6, MAX_LEVEL])
+def test_tile_slices_match_brute_force(scattered, level):
+    x, y, laid_at = scattered
+    pyramid = make_pyramid(x, y, laid_at)
+    cells = 2 ** level
+    ix = np.floor(x / WORLD_SIZE_CM * cells).astype(int)
+    iy = np.floor(y / WORLD_SIZE_CM * cells).astype(int)
+    size = pyramid.tile_size(level)
+
+    rng = np.random.default_rng(level)
+    tiles = {(int(ix[i]), int(iy[i])) for i in rng.integers(0, len(x), 20)}
+    tiles.add((0, 0))
+    for tx, ty in tiles:
+        eggs = pyramid._tile_slice(level, tx, ty)
+        assert eggs.stop - eggs.start == np.count_nonzero((ix == tx) & (iy == ty))
+        tolerance = 1e-5
+        assert np.all((pyramid.x[eggs] >= tx * size - tolerance) & (pyramid.x[eggs] <= (tx + 1) * size + tolerance))
+        assert np.all((pyramid.y[eggs] >= ty * size - tolerance) & (pyramid.y[eggs] <= (ty + 1) * size + tolerance))
+
+
+def test_render_view_is_always_view_sized(scattered):
+    pyramid = make_pyramid(*scattered)
+    edges = [0.0, 0.01, WORLD_SIZE_CM / 2, WORLD_SIZE_CM - 0.01, WORLD_SIZE_CM]
+    for zoom in [0, 2, MAX_LEVEL - 1]:
+        for center_x in edges:
+            for center_y in edges:
+                view, _ = pyramid.render_view(center_x, center_y, zoom, progress=1.0)
+                assert view.shape == (2 * TILE_SIZE_PX, 2 * TILE_SIZE_PX, 4)
+
+
+def test_fully_laid_and_unlaid_tiles_are_reused_across_steps():
+    # Left half laid early, right half laid late, one tile per half at level 1
+    rng = np.random.default_rng(3)
+    x = np.concatenate([rng.uniform(0.5, 4.5, 200), rng.uniform(5.5, 9.5, 200)])
+    y = rng.uniform(0.5, 4.5, 400)
+    laid_at = np.concatenate([np.full(200, 0.1), np.full(200, 0.9)])
+    pyramid = make_pyramid(x, y, laid_at)
+
+    for progress in [0.3, 0.5, 0.7]:
+        pyramid.get_tile(1, 0, 0, progress)  # Complete
+        pyramid.get_tile(1, 1, 0, progress)  # Empty
+    assert pyramid.cache_info()["misses"] == 2
+    assert pyramid.cache_info()["hits"] == 4
+
+    pyramid.get_tile(1, 1, 0, 0.95)
+    assert pyramid.cache_info()["misses"] == 3
+
+
+def test_partially_laid_tiles_render_per_step(scattered):
+    pyramid = make_pyramid(*scattered)
+    for progress in [0.3, 0.5]:
+        pyramid.get_tile(0, 0, 0, progress)
+    assert pyramid.cache_info()["misses"] == 2
+
+
+def test_evicts_least_recently_used_tiles_past_the_byte_limit(scattered):
+    pyramid = make_pyramid(*scattered, max_tiles=3)
+    first = pyramid.get_tile(2, 0, 0, 1.0)
+    for tx in range(1, 4):
+        pyramid.get_tile(2, tx, 0, 1.0)
+    pyramid.get_tile(2, 0, 1, 1.0)
+
+    info = pyramid.cache_info()
+    assert info["evictions"] == 2
+    assert info["tiles"] == 3
+    assert pyramid.tile_cache.bytes == 3 * first.nbytes
+    pyramid.get_tile(2, 0, 0, 1.0)
+    assert pyramid.cache_info()["misses"] == 6
+
+
+def test_pyramids_sharing_a_cache_do_not_see_each_others_tiles(scattered):
+    x, y, laid_at = scattered
+    cache = TileCache(max_bytes=16 * TILE_BYTES)
+    first = EggTilePyramid(x, y, laid_at, tile_cache=cache)
+    second = EggTilePyramid(x[::2], y[::2], laid_at[::2], tile_cache=cache)
+    first.get_tile(0, 0, 0, 1.0)
+    second.get_tile(0, 0, 0, 1.0)
+    assert second.cache_info()["misses"] == 1
+    assert len(cache) == 2
@@ -0,0 +1,50 @@
+import pytest
+
+from egg_visualizer import (
+    FIGURE_SIZE_IN, FULL_QUALITY_DPI, MIN_PREVIEW_DPI, choose_preview_dpi, fit_render_cost,
+)
+
+
+def timings(fixed, per_dpi2, dpis):
+    return [(dpi, fixed + per_dpi2 * dpi ** 2) for dpi in dpis]
+
+
+def test_fit_recovers_fixed_and_pixel_cost():
+    fixed, per_dpi2 = fit_render_cost(timings(0.4, 1e-5, [30, 60, 120]))
+    assert fixed == pytest.approx(0.4)
+    assert per_dpi2 == pytest.approx(1e-5)
+
+
+def test_fit_needs_two_dpis():
+    assert fit_render_cost([(60, 0.2), (60, 0.25)]) is None
+
+
+def test_uses_display_width_without_timings():
+    assert choose_preview_dpi(1200, 0.3) == 1200 // FIGURE_SIZE_IN
+    assert choose_preview_dpi(100, 0.3) == MIN_PREVIEW_DPI
+    assert choose_preview_dpi(3840, 0.3) == FULL_QUALITY_DPI
+
+
+def test_single_timing_over_budget_probes_a_lower_dpi():
+    assert choose_preview_dpi(1200, 0.3, [(120, 0.2)]) == 120
+    assert 60 <= choose_preview_dpi(1200, 0.3, [(120, 1.2)]) < 120
+
+
+def test_lowers_dpi_to_fit_the_pixel_cost_in_the_budget():
+    # 0.1 s fixed, so 0.2 s of a 0.3 s budget is left for pixels
+    dpi = choose_preview_dpi(1200, 0.3, timings(0.1, 4e-5, [60, 120]))
+    assert dpi == pytest.approx((0.2 / 4e-5) ** 0.5, abs=1)
+
+
+def test_keeps_resolution_when_fixed_cost_dominates():
+    # Measured shape of a heavy preview: 426 ms at 30 DPI, 521 ms at 120 DPI
+    assert choose_preview_dpi(1200, 0.3, [(30, 0.426), (120, 0.521)]) == 120
+    # Lower DPIs measured no faster
+    assert choose_preview_dpi(1200, 0.1, [(30, 0.312), (120, 0.270)]) == 120
+
+
+def test_stops_lowering_once_pixels_are_a_small_share_of_the_cost():
+    fixed, per_dpi2 = 0.4, 2e-5
+    dpi = choose_preview_dpi(2000, 0.1, timings(fixed, per_dpi2, [60, 200]))
+    assert MIN_PREVIEW_DPI < dpi < 200
+    assert per_dpi2 * dpi ** 2 == pytest.approx(fixed / 4, rel=0.05)
@@ -0,0 +1,174 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from render_service import RenderError, RenderJob, RenderService, RenderServiceBusy
+
+SETTINGS = ("Aglajid Sea Slug", "rock", 20, 0.5)
+
+
+def preview_job(step):
+    return RenderJob(SETTINGS, 1, step, "preview", 30)
+
+
+def slow_job(step):
+    """A full-quality frame, slow enough to keep a worker busy while other jobs queue."""
+    return RenderJob(SETTINGS, 1, step, "full", 200)
+
+
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the render service"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def make(**kwargs):
+        service = RenderService(**kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.shutdown()
+
+
+def test_identical_jobs_from_different_sessions_render_once(make_service):
+    service = make_service(num_workers=1)
+    blocker = service.submit("x", slow_job(90))
+    first = service.submit("a", preview_job(10))
+    second = service.submit("b", preview_job(10))
+
+    assert first is second
+    assert first.result(60).png_bytes.startswith(b"\x89PNG")
+    blocker.result(60)
+    stats = service.stats()
+    assert stats["deduplicated"] == 1
+    assert stats["completed"] == 2
+
+
+def test_newer_frame_supersedes_oldest_queued_frame(make_service):
+    service = make_service(num_workers=1, max_pending_per_session=2)
+    blocker = service.submit("x", slow_job(90))
+    oldest = service.submit("a", preview_job(1))
+    middle = service.submit("a", preview_job(2))
+    newest = service.submit("a", preview_job(3))
+
+    with pytest.raises(RenderServiceBusy):
+        oldest.result(60)
+    middle.result(60)
+    newest.result(60)
+    blocker.result(60)
+    assert service.stats()["superseded"] == 1
+
+
+def test_supersede_keeps_frames_other_sessions_wait_on(make_service):
+    service = make_service(num_workers=1, max_pending_per_session=2)
+    blocker = service.submit("x", slow_job(90))
+    shared = service.submit("a", preview_job(1))
+    own = service.submit("a", preview_job(2))
+    assert service.submit("b", preview_job(1)) is shared
+    newest = service.submit("a", preview_job(3))
+
+    with pytest.raises(RenderServiceBusy):
+        own.result(60)
+    shared.result(60)
+    newest.result(60)
+    blocker.result(60)
+
+
+def test_sessions_are_served_round_robin(make_service):
+    service = make_service(num_workers=1, max_pending_per_session=4)
+    finished = []
+    futures = [service.submit("x", slow_job(90))]
+    for session_id, step in [("a", 1), ("a", 2), ("a", 3), ("b", 4)]:
+        future = service.submit(session_id, preview_job(step))
+        future.add_done_callback(lambda _, name=f"{session_id}{step}": finished.append(name))
+        futures.append(future)
+
+    for future in futures:
+        future.result(60)
+    assert finished == ["a1", "b4", "a2", "a3"]
+
+
+def test_rejects_jobs_when_queue_is_full(make_service):
+    service = make_service(num_workers=1, max_queue_depth=2)
+    blocker = service.submit("x", slow_job(90))
+    queued = [service.submit("a", preview_job(1)), service.submit("b", preview_job(2))]
+
+    with pytest.raises(RenderServiceBusy):
+        service.submit("c", preview_job(3))
+    assert service.stats()["rejected"] == 1
+    for future in [blocker] + queued:
+        future.result(60)
+
+
+def test_timed_out_job_is_forgotten(make_service):
+    service = make_service(num_workers=1)
+    blocker = service.submit("x", slow_job(90))
+
+    with pytest.raises(FutureTimeoutError):
+        service.render("a", preview_job(1), timeout=0.01)
+    assert service.stats()["queue_depth"] == 0
+    retry = service.submit("a", preview_job(1))
+    assert service.stats()["deduplicated"] == 0
+    retry.result(60)
+    blocker.result(60)
+
+
+def test_abandoned_run_does_not_resolve_a_resubmitted_job(make_service):
+    service = make_service(num_workers=1, max_pending_per_session=2)
+    job = slow_job(90)
+    with pytest.raises(FutureTimeoutError):
+        service.render("a", job, timeout=0.01)
+    blocker = service.submit("x", slow_job(91))
+    retry = service.submit("a", job)
+    wait_until(lambda: service.stats()["completed"] == 1)
+
+    assert not retry.done()
+    newer = [service.submit("a", preview_job(1)), service.submit("a", preview_job(2))]
+    with pytest.raises(RenderServiceBusy):
+        retry.result(60)
+    for future in [blocker] + newer:
+        future.result(60)
+    assert service.stats()["superseded"] == 1
+
+
+def test_replaces_crashed_worker_while_other_jobs_are_in_flight(make_service):
+    service = make_service(num_workers=2)
+    running = [service.submit("a", slow_job(90)), service.submit("b", slow_job(91))]
+    queued = service.submit("c", preview_job(1))
+    wait_until(lambda: service.stats()["in_flight"] == 2)
+
+    os.kill(service.worker_pids()[0], signal.SIGKILL)
+
+    outcomes = []
+    for future in running:
+        try:
+            future.result(60)
+            outcomes.append("done")
+        except RenderError:
+            outcomes.append("failed")
+    assert sorted(outcomes) == ["done", "failed"]
+    queued.result(60)
+    assert service.render("a", preview_job(2), timeout=60).png_bytes.startswith(b"\x89PNG")
+
+    stats = service.stats()
+    assert stats["restarts"] == 1
+    assert stats["in_flight"] == 0
+    assert all(worker["alive"] for worker in stats["per_worker"])
+
+
+def test_worker_modules_do_not_import_streamlit():
+    code = "import sys, egg_visualizer, sea_slugs; sys.exit('streamlit' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0